@@ -0,0 +1,30 @@
+"""revoked tokens
+
+Revision ID: 3f9a1c2d7b4e
+Revises: 64cd4beb4a5a
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '3f9a1c2d7b4e'
+down_revision: Union[str, None] = '64cd4beb4a5a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('revoked_tokens',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('revoked_before', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_index(op.f('ix_revoked_tokens_revoked_before'), 'revoked_tokens', ['revoked_before'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_revoked_tokens_revoked_before'), table_name='revoked_tokens')
+    op.drop_table('revoked_tokens')
@@ -0,0 +1,23 @@
+"""users created_at index
+
+Revision ID: 8b2e5d41c0a7
+Revises: 3f9a1c2d7b4e
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '8b2e5d41c0a7'
+down_revision: Union[str, None] = '3f9a1c2d7b4e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_created_at_id', table_name='users')
@@ -0,0 +1,30 @@
+"""users unverified created_at index
+
+Revision ID: c41d7e9a2f58
+Revises: 8b2e5d41c0a7
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'c41d7e9a2f58'
+down_revision: Union[str, None] = '8b2e5d41c0a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_users_unverified_created_at',
+        'users',
+        ['created_at'],
+        unique=False,
+        postgresql_where=sa.text('is_verified = false'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_unverified_created_at', table_name='users', postgresql_where=sa.text('is_verified = false'))
@@ -0,0 +1,48 @@
+"""users email lower
+
+Revision ID: e7a3f0b95d12
+Revises: c41d7e9a2f58
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'e7a3f0b95d12'
+down_revision: Union[str, None] = 'c41d7e9a2f58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_constraint('users_email_key', 'users', type_='unique')
+
+    # Emails that differ only in case belong to one account from now on. Keep the most privileged,
+    # then the oldest, and turn the others into anonymous users: their rows (and ids) survive but they
+    # can no longer log in, and the pruning job removes them once they are old enough.
+    op.execute(sa.text(
+        """
+        UPDATE users SET email = NULL, password_hash = NULL, is_verified = false
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY lower(email)
+                    ORDER BY is_superuser DESC, is_verified DESC, created_at ASC NULLS LAST, id
+                ) AS rank
+                FROM users
+                WHERE email IS NOT NULL
+            ) ranked
+            WHERE rank > 1
+        )
+        """
+    ))
+    op.execute(sa.text("UPDATE users SET email = lower(email) WHERE email <> lower(email)"))
+
+    op.create_index('ix_users_email_lower', 'users', [sa.text('lower(email)')], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_email_lower', table_name='users')
+    op.create_unique_constraint('users_email_key', 'users', ['email'])
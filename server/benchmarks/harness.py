@@ -0,0 +1,125 @@
+"""
+Shared plumbing for the benchmarks: an in-process app on SQLite and a concurrent load driver.
+
+The app is the real ``create_app()`` with ``get_postgres_session`` overridden to an aiosqlite
+database, as in ``tests/conftest.py``, so every request exercises the full middleware, dependency
+and repository stack without a network or Postgres. Unlike the tests, the database is a
+temporary WAL-mode file with a connection pool, because concurrent sessions cannot share the
+single connection of an in-memory database.
+"""
+
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import asdict, dataclass
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+# Every benchmark request comes from the same client address
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import structlog  # noqa: E402
+from httpx import ASGITransport, AsyncClient, Response  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+from src.core.database import Base, get_postgres_session, instrument_engine  # noqa: E402
+from src.main import create_app  # noqa: E402
+
+RequestFn = Callable[[AsyncClient, int], Awaitable[Response]]
+
+
+@dataclass
+class ScenarioResult:
+    requests: int
+    concurrency: int
+    errors: int
+    throughput_rps: float
+    p50_ms: float
+    p99_ms: float
+
+    def to_dict(self) -> dict[str, float | int]:
+        return asdict(self)
+
+
+class BenchmarkApp:
+    """``create_app()`` wired to a fresh SQLite database in a temporary directory"""
+
+    def __init__(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.engine = create_async_engine(
+            f"sqlite+aiosqlite:///{self._tmpdir.name}/bench.db",
+            pool_size=20,
+            connect_args={"timeout": 30},
+        )
+        event.listen(self.engine.sync_engine, "connect", _set_sqlite_pragmas)
+        instrument_engine(self.engine)
+        self.session_factory = async_sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        self.app = create_app()
+        self.app.dependency_overrides[get_postgres_session] = self._get_session
+
+    async def _get_session(self) -> AsyncIterator[AsyncSession]:
+        async with self.session_factory() as session:
+            yield session
+
+    async def __aenter__(self) -> "BenchmarkApp":
+        # Render log lines as in production but throw them away
+        structlog.configure(
+            processors=[structlog.processors.TimeStamper(fmt="iso"), structlog.processors.JSONRenderer()],
+            logger_factory=structlog.WriteLoggerFactory(file=open(os.devnull, "w")),  # noqa: SIM115
+        )
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.engine.dispose()
+        self._tmpdir.cleanup()
+
+    def client(self) -> AsyncClient:
+        return AsyncClient(transport=ASGITransport(app=self.app), base_url="http://bench")
+
+
+def _set_sqlite_pragmas(dbapi_connection: object, connection_record: object) -> None:
+    cursor = dbapi_connection.cursor()  # type: ignore[attr-defined]
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run_load(client: AsyncClient, request: RequestFn, requests: int, concurrency: int) -> ScenarioResult:
+    """Issue ``requests`` calls to ``request`` from ``concurrency`` concurrent workers"""
+    latencies: list[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker() -> None:
+        nonlocal errors, next_index
+        while next_index < requests:
+            index = next_index
+            next_index += 1
+            start = time.perf_counter()
+            response = await request(client, index)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return ScenarioResult(
+        requests=requests,
+        concurrency=concurrency,
+        errors=errors,
+        throughput_rps=round(requests / elapsed, 1),
+        p50_ms=round(statistics.median(latencies) * 1000, 3),
+        p99_ms=round(_percentile(latencies, 99) * 1000, 3),
+    )
@@ -0,0 +1,62 @@
+"""
+Per-request overhead of the middleware stack.
+
+Drives GET /health in-process through httpx's ASGITransport against the full app from
+``create_app()`` and against a bare app that serves the same routes without middleware,
+and reports the difference.
+
+Usage: python -m benchmarks.middleware [--requests N] [--rounds N]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+import structlog  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+from src.api.router import router  # noqa: E402
+from src.main import create_app  # noqa: E402
+
+
+async def time_requests(app: FastAPI, requests: int) -> float:
+    """Return mean seconds per request"""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        for _ in range(50):
+            await client.get("/health")
+        start = time.perf_counter()
+        for _ in range(requests):
+            await client.get("/health")
+        return (time.perf_counter() - start) / requests
+
+
+async def main(requests: int, rounds: int) -> None:
+    # Keep the access log from dominating the measurement
+    structlog.configure(logger_factory=structlog.ReturnLoggerFactory())
+
+    full_app = create_app()
+    bare_app = FastAPI()
+    bare_app.include_router(router)
+
+    full, bare = [], []
+    for _ in range(rounds):
+        full.append(await time_requests(full_app, requests))
+        bare.append(await time_requests(bare_app, requests))
+
+    full_us = statistics.median(full) * 1e6
+    bare_us = statistics.median(bare) * 1e6
+    print(f"bare app:          {bare_us:8.1f} us/request")
+    print(f"full middleware:   {full_us:8.1f} us/request")
+    print(f"middleware cost:   {full_us - bare_us:8.1f} us/request")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.rounds))
@@ -0,0 +1,197 @@
+"""
+Throughput and latency benchmarks for the API hot paths.
+
+Runs each scenario against the in-process app (see ``benchmarks/harness.py``), writes the
+results as JSON and compares them with a stored baseline. Exits non-zero when any scenario
+returned errors or regressed beyond ``--threshold`` (throughput down or p50 latency up).
+
+Usage:
+    python -m benchmarks.run                          # all scenarios, compare with baseline.json
+    python -m benchmarks.run -s me -s health -c 50    # selected scenarios at concurrency 50
+    python -m benchmarks.run --update-baseline        # record a new baseline on this machine
+
+Baselines are machine specific: record one on the machine that runs the comparison.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import sys
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+
+from httpx import AsyncClient, Response
+
+from benchmarks.harness import BenchmarkApp, RequestFn, ScenarioResult, run_load
+
+DEFAULT_BASELINE = Path(__file__).with_name("baseline.json")
+USER_EMAIL = "bench-user@example.com"
+USER_PASSWORD = "bench-password"
+
+
+async def create_anonymous(client: AsyncClient) -> str:
+    response = await client.post("/api/users/")
+    response.raise_for_status()
+    return str(response.json()["access_token"])
+
+
+async def create_registered(client: AsyncClient) -> str:
+    token = await create_anonymous(client)
+    response = await client.post(
+        "/api/users/register",
+        json={"email": USER_EMAIL, "password": USER_PASSWORD},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    response.raise_for_status()
+    return str(response.json()["access_token"])
+
+
+@dataclass
+class Scenario:
+    # Builds the per-request function once the app and seed data exist; may do untimed setup work
+    prepare: Callable[[AsyncClient, int], Awaitable[RequestFn]]
+    hashes_passwords: bool = False
+
+
+async def prepare_health(client: AsyncClient, requests: int) -> RequestFn:
+    async def request(client: AsyncClient, i: int) -> Response:
+        return await client.get("/health")
+
+    return request
+
+
+async def prepare_create_user(client: AsyncClient, requests: int) -> RequestFn:
+    async def request(client: AsyncClient, i: int) -> Response:
+        return await client.post("/api/users/")
+
+    return request
+
+
+async def prepare_me(client: AsyncClient, requests: int) -> RequestFn:
+    headers = {"Authorization": f"Bearer {await create_registered(client)}"}
+
+    async def request(client: AsyncClient, i: int) -> Response:
+        return await client.get("/api/users/me", headers=headers)
+
+    return request
+
+
+async def prepare_login(client: AsyncClient, requests: int) -> RequestFn:
+    await create_registered(client)
+    body = {"email": USER_EMAIL, "password": USER_PASSWORD}
+
+    async def request(client: AsyncClient, i: int) -> Response:
+        return await client.post("/api/users/login", json=body)
+
+    return request
+
+
+async def prepare_register(client: AsyncClient, requests: int) -> RequestFn:
+    tokens = [await create_anonymous(client) for _ in range(requests)]
+
+    async def request(client: AsyncClient, i: int) -> Response:
+        return await client.post(
+            "/api/users/register",
+            json={"email": f"bench-register-{i}@example.com", "password": USER_PASSWORD},
+            headers={"Authorization": f"Bearer {tokens[i]}"},
+        )
+
+    return request
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "health": Scenario(prepare_health),
+    "create_user": Scenario(prepare_create_user),
+    "me": Scenario(prepare_me),
+    "login": Scenario(prepare_login, hashes_passwords=True),
+    "register": Scenario(prepare_register, hashes_passwords=True),
+}
+
+
+async def run_scenarios(names: list[str], concurrency: int, requests: int, hash_requests: int) -> dict[str, object]:
+    results: dict[str, dict[str, float | int]] = {}
+    for name in names:
+        scenario = SCENARIOS[name]
+        count = hash_requests if scenario.hashes_passwords else requests
+        # A fresh database per scenario keeps seed data and table size independent of run order
+        async with BenchmarkApp() as bench, bench.client() as client:
+            request = await scenario.prepare(client, count)
+            result: ScenarioResult = await run_load(client, request, count, concurrency)
+        results[name] = result.to_dict()
+        print(
+            f"{name:<12} {result.throughput_rps:>9.1f} req/s  p50 {result.p50_ms:>8.2f} ms  "
+            f"p99 {result.p99_ms:>8.2f} ms  errors {result.errors}"
+        )
+
+    return {
+        "meta": {
+            "created_at": datetime.now(UTC).isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "concurrency": concurrency,
+        },
+        "scenarios": results,
+    }
+
+
+def compare(results: dict[str, object], baseline: dict[str, object], threshold: float) -> list[str]:
+    """Return a description of every regression beyond ``threshold`` (a fraction, e.g. 0.25)"""
+    current = results["scenarios"]
+    previous = baseline.get("scenarios", {})
+    assert isinstance(current, dict) and isinstance(previous, dict)
+
+    regressions = []
+    for name, result in current.items():
+        base = previous.get(name)
+        if base is None:
+            continue
+        if result["throughput_rps"] < base["throughput_rps"] * (1 - threshold):
+            regressions.append(f"{name}: throughput {result['throughput_rps']} < baseline {base['throughput_rps']}")
+        if result["p50_ms"] > base["p50_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p50 {result['p50_ms']} ms > baseline {base['p50_ms']} ms")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-s", "--scenario", action="append", choices=sorted(SCENARIOS), help="default: all")
+    parser.add_argument("-c", "--concurrency", type=int, default=10)
+    parser.add_argument("-n", "--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--hash-requests", type=int, default=20, help="requests for bcrypt-bound scenarios")
+    parser.add_argument("-o", "--output", type=Path, default=Path("benchmark-results.json"))
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed regression, as a fraction")
+    parser.add_argument("--update-baseline", action="store_true", help="write the results to --baseline")
+    args = parser.parse_args()
+
+    names = args.scenario or list(SCENARIOS)
+    results = asyncio.run(run_scenarios(names, args.concurrency, args.requests, args.hash_requests))
+    args.output.write_text(json.dumps(results, indent=2) + "\n")
+
+    scenarios = results["scenarios"]
+    assert isinstance(scenarios, dict)
+    failed = [name for name, result in scenarios.items() if result["errors"]]
+    for name in failed:
+        print(f"FAIL {name}: {scenarios[name]['errors']} requests returned an error status")
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+    elif args.baseline.exists():
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if not regressions:
+            print(f"No regressions beyond {args.threshold:.0%} of {args.baseline}")
+        failed.extend(regressions)
+    else:
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""
+Per-request cost of turning a user into a JSON response body.
+
+Times the ways a handler's ``TokenResponse`` can become bytes, from the ORM object a handler
+starts with:
+
+- ``stdlib``: ``jsonable_encoder`` plus ``JSONResponse`` (FastAPI with a custom response class)
+- ``response_model``: FastAPI's default path, re-validating the returned model then dumping it
+- ``model_response``: ``ModelResponse``, the model's compiled serializer only
+
+Usage: python -m benchmarks.serialization [--iterations N] [--rounds N]
+"""
+
+import argparse
+import os
+import statistics
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+from uuid import uuid4
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse, Response  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from src.core.auth import create_token_for_user  # noqa: E402
+from src.core.responses import ModelResponse  # noqa: E402
+from src.models.postgres.users import UserModel  # noqa: E402
+from src.schemas.users import TokenResponse, UserResponse  # noqa: E402
+
+
+def time_per_call(fn: Callable[[], object], iterations: int, rounds: int) -> float:
+    """Return the median over ``rounds`` of mean seconds per call"""
+    fn()
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        samples.append((time.perf_counter() - start) / iterations)
+    return statistics.median(samples)
+
+
+def main(iterations: int, rounds: int) -> None:
+    user = UserModel(
+        id=uuid4(), email="bench@example.com", is_verified=True, is_superuser=False, created_at=datetime.now(UTC)
+    )
+    token = create_token_for_user(user)
+    adapter = TypeAdapter(TokenResponse)
+
+    def build() -> TokenResponse:
+        return TokenResponse(access_token=token, user=UserResponse.model_validate(user))
+
+    def stdlib() -> Response:
+        return JSONResponse(jsonable_encoder(build()))
+
+    def response_model() -> Response:
+        content = adapter.dump_json(adapter.validate_python(build(), from_attributes=True))
+        return Response(content=content, media_type="application/json")
+
+    def model_response() -> Response:
+        return ModelResponse(build())
+
+    baseline = time_per_call(build, iterations, rounds)
+    print(f"{'build model':<16} {baseline * 1e6:8.2f} us/request")
+    for name, fn in (("stdlib", stdlib), ("response_model", response_model), ("model_response", model_response)):
+        total = time_per_call(fn, iterations, rounds)
+        print(f"{name:<16} {total * 1e6:8.2f} us/request  (serialization {(total - baseline) * 1e6:6.2f} us)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    main(args.iterations, args.rounds)
@@ -0,0 +1,140 @@
+"""
+Startup budget: where a fresh worker spends its time before serving its first request.
+
+Reports, each in a fresh interpreter:
+
+- the modules with the highest import time (``python -X importtime``), and totals per package
+- the phases up to the first request, in wall-clock time since launch: interpreter start,
+  ``import src.main`` (which builds the app), the first ``GET /health`` and the first ``GET /openapi.json``
+
+Usage: python -m benchmarks.startup [--top N] [--budget SECONDS]
+
+With ``--budget``, exits non-zero when the time to the first request exceeds it.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+
+SERVER_ROOT = Path(__file__).resolve().parent.parent
+
+
+@dataclass
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def _child_env() -> dict[str, str]:
+    return {"SECRET_KEY": "benchmark-secret-key", **os.environ}
+
+
+def profile_imports() -> list[ImportTiming]:
+    """Import ``src.main`` under ``-X importtime`` and parse the per-module timings"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.main"],
+        cwd=SERVER_ROOT,
+        env=_child_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line.removeprefix("import time:").split("|")
+        timings.append(ImportTiming(module.strip(), int(self_us), int(cumulative_us)))
+    return timings
+
+
+def measure_phases() -> dict[str, float]:
+    """Time each startup phase in a fresh interpreter; values are wall-clock seconds since it was launched"""
+    start = time.perf_counter()
+    # Wall clock, since the child cannot tell when it was launched: its CPU time misses time spent
+    # waiting, e.g. on I/O while importing
+    launched_at = time.time()
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--phases-child", repr(launched_at)],
+        cwd=SERVER_ROOT,
+        env=_child_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = time.perf_counter() - start
+    phases: dict[str, float] = json.loads(result.stdout.splitlines()[-1])
+    phases["process_exit"] = total
+    return phases
+
+
+def _phases_child(launched_at: float) -> None:
+    # Runs in the fresh interpreter started by measure_phases()
+    def elapsed() -> float:
+        return time.time() - launched_at
+
+    phases: dict[str, float] = {"interpreter": elapsed()}
+
+    import src.main
+
+    app = src.main.app
+    phases["import"] = elapsed()
+
+    from httpx import ASGITransport, AsyncClient
+
+    async def first_requests() -> None:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://startup") as client:
+            (await client.get("/health")).raise_for_status()
+            phases["first_request"] = elapsed()
+            if app.openapi_url:
+                (await client.get(app.openapi_url)).raise_for_status()
+                phases["first_openapi"] = elapsed()
+
+    asyncio.run(first_requests())
+    print(json.dumps(phases))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=20, help="modules to list")
+    parser.add_argument("--budget", type=float, help="maximum seconds to the first request")
+    parser.add_argument("--phases-child", type=float, metavar="LAUNCHED_AT", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.phases_child is not None:
+        _phases_child(args.phases_child)
+        return 0
+
+    timings = profile_imports()
+    print(f"Slowest imports (self time), {sum(t.self_us for t in timings) / 1000:.0f} ms in total:")
+    for timing in sorted(timings, key=lambda t: t.self_us, reverse=True)[: args.top]:
+        print(f"  {timing.self_us / 1000:8.1f} ms  {timing.module}")
+
+    packages: dict[str, int] = defaultdict(int)
+    for timing in timings:
+        packages[timing.module.split(".")[0]] += timing.self_us
+    print("By package:")
+    for package, self_us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[: args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  {package}")
+
+    phases = measure_phases()
+    print("Startup phases (wall-clock seconds since the process was launched):")
+    for phase, seconds in phases.items():
+        print(f"  {phase:<16} {seconds:7.3f}")
+
+    if args.budget is not None and phases["first_request"] > args.budget:
+        print(f"FAIL first request after {phases['first_request']:.3f}s, budget {args.budget:.3f}s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""
+Python-side cost of the hot user lookups, with the statement built per call or once.
+
+SQLAlchemy caches compiled SQL keyed on a statement's structure, so a rebuilt ``select`` is not
+recompiled; what it still pays per call is constructing the statement and generating that cache
+key. A statement built once at import (as ``UserRepository`` does for ``get_user`` and
+``get_user_by_email``) memoizes its key and skips both.
+
+Reported per lookup:
+
+- ``prepare``: statement construction plus cache key generation alone
+- ``get_user``: the full ``session.execute`` on an in-memory SQLite database, so the difference
+  between the two variants is the saving and the rest is mostly ORM and driver time
+
+Usage: python -m benchmarks.statements [--iterations N] [--rounds N]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+from sqlalchemy import select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+from src.core.database import Base  # noqa: E402
+from src.models.postgres.users import UserModel  # noqa: E402
+from src.repositories.users import UserRepository, _select_user_by_id  # noqa: E402
+
+
+def time_per_call(fn: Callable[[], object], iterations: int, rounds: int) -> float:
+    """Return the median over ``rounds`` of mean seconds per call"""
+    fn()
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        samples.append((time.perf_counter() - start) / iterations)
+    return statistics.median(samples)
+
+
+async def atime_per_call(fn: Callable[[], Awaitable[object]], iterations: int, rounds: int) -> float:
+    await fn()
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await fn()
+        samples.append((time.perf_counter() - start) / iterations)
+    return statistics.median(samples)
+
+
+def report(name: str, rebuilt: float, prebuilt: float) -> None:
+    print(
+        f"{name:<10} rebuilt {rebuilt * 1e6:8.2f} us  prebuilt {prebuilt * 1e6:8.2f} us  "
+        f"saved {(rebuilt - prebuilt) * 1e6:6.2f} us/lookup"
+    )
+
+
+async def main(iterations: int, rounds: int) -> None:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        user = await UserRepository(session).create_user()
+        user_id = user.id
+
+        def prepare_rebuilt() -> object:
+            return select(UserModel).where(UserModel.id == user_id)._generate_cache_key()
+
+        def prepare_prebuilt() -> object:
+            return _select_user_by_id._generate_cache_key()
+
+        async def get_rebuilt() -> UserModel | None:
+            result = await session.execute(select(UserModel).where(UserModel.id == user_id))
+            return result.scalar_one_or_none()
+
+        async def get_prebuilt() -> UserModel | None:
+            return await UserRepository(session).get_user(user_id)
+
+        report(
+            "prepare",
+            time_per_call(prepare_rebuilt, iterations, rounds),
+            time_per_call(prepare_prebuilt, iterations, rounds),
+        )
+        lookups = max(1, iterations // 10)
+        report(
+            "get_user",
+            await atime_per_call(get_rebuilt, lookups, rounds),
+            await atime_per_call(get_prebuilt, lookups, rounds),
+        )
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations, args.rounds))
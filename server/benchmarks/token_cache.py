@@ -0,0 +1,62 @@
+"""
+Auth overhead of ``/api/users/me`` with and without the decoded-token cache.
+
+Two measurements, each with ``token_cache`` enabled and then disabled:
+
+- ``decode``: ``decode_jwt_payload`` alone for one repeated bearer token
+- ``/api/users/me``: the full request under load on the in-process app (see ``harness.py``),
+  where the principal cache already spares the database, so token verification is most of the
+  remaining auth work
+
+Usage: python -m benchmarks.token_cache [--iterations N] [--requests N] [--concurrency N]
+"""
+
+import argparse
+import asyncio
+import os
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+from httpx import AsyncClient, Response  # noqa: E402
+from src.core.auth import decode_jwt_payload  # noqa: E402
+from src.core.cache import token_cache  # noqa: E402
+
+from benchmarks.harness import BenchmarkApp, run_load  # noqa: E402
+from benchmarks.run import create_registered  # noqa: E402
+from benchmarks.statements import time_per_call  # noqa: E402
+
+
+def set_enabled(enabled: bool, max_size: int) -> None:
+    token_cache.clear()
+    token_cache.max_size = max_size if enabled else 0
+
+
+async def main(iterations: int, requests: int, concurrency: int) -> None:
+    max_size = token_cache.max_size
+    async with BenchmarkApp() as bench, bench.client() as client:
+        token = await create_registered(client)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        async def me(client: AsyncClient, i: int) -> Response:
+            return await client.get("/api/users/me", headers=headers)
+
+        for enabled in (False, True):
+            set_enabled(enabled, max_size)
+            label = "cached" if enabled else "uncached"
+            decode = time_per_call(lambda: decode_jwt_payload(token), iterations, rounds=5)
+            result = await run_load(client, me, requests, concurrency)
+            print(
+                f"{label:<9} decode {decode * 1e6:7.2f} us  /api/users/me {result.throughput_rps:>8.1f} req/s  "
+                f"p50 {result.p50_ms:>7.3f} ms  p99 {result.p99_ms:>7.3f} ms  errors {result.errors}"
+            )
+
+    set_enabled(True, max_size)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=5_000, help="decode calls per round")
+    parser.add_argument("-n", "--requests", type=int, default=2_000)
+    parser.add_argument("-c", "--concurrency", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations, args.requests, args.concurrency))
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Script to pick password hashing costs for this machine.
+Usage: python scripts/calibrate_password_hash.py [--budget-ms 250] [--scheme bcrypt|argon2]
+
+Times one hash at increasing cost and prints the settings for the highest cost that stays within
+the latency budget. Run it on the hardware (and CPU limits) the server is deployed with: a login
+or register costs about one hash. Changed costs apply to existing users on their next login,
+see PASSWORD_REHASH_ON_LOGIN.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# Add the src directory to Python path - handle both local and Docker environments
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+if os.path.exists('/app/src'):
+    sys.path.insert(0, '/app')
+
+from passlib.hash import argon2, bcrypt  # noqa: E402
+from src.core.config import settings  # noqa: E402
+
+PASSWORD = "calibration-password"
+
+
+def time_hash(handler, samples):
+    """Median seconds per hash with ``handler`` (a configured passlib handler)"""
+    handler.hash(PASSWORD)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        handler.hash(PASSWORD)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def calibrate(costs, make_handler, budget, samples, label):
+    """Return the highest cost in ``costs`` (ascending) hashing within ``budget`` seconds"""
+    chosen = None
+    for cost in costs:
+        elapsed = time_hash(make_handler(cost), samples)
+        within = elapsed <= budget
+        print(f"  {label}={cost:<4} {elapsed * 1000:8.1f} ms" + ("" if within else "  (over budget)"))
+        if not within:
+            break
+        chosen = cost
+    return chosen
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=250.0, help="target time for one hash")
+    parser.add_argument("--scheme", choices=["bcrypt", "argon2"], default=settings.password_hash_scheme)
+    parser.add_argument("--samples", type=int, default=5, help="hashes timed per cost")
+    args = parser.parse_args()
+    budget = args.budget_ms / 1000
+
+    print(f"🔧 Calibrating {args.scheme} for {args.budget_ms:.0f} ms per hash")
+    if args.scheme == "bcrypt":
+        rounds = calibrate(
+            range(10, 20), lambda cost: bcrypt.using(rounds=cost), budget, args.samples, "rounds"
+        )
+        if rounds is None:
+            print("❌ Even 10 rounds exceed the budget; bcrypt should not go lower")
+            return 1
+        print("\n✅ Suggested settings:")
+        print("PASSWORD_HASH_SCHEME=bcrypt")
+        print(f"PASSWORD_BCRYPT_ROUNDS={rounds}")
+        return 0
+
+    if not argon2.has_backend():
+        print("❌ argon2-cffi is not installed, install the argon2 extra")
+        return 1
+    # Memory is the configured bound; time_cost is what fits the budget
+    memory_kib = settings.password_argon2_memory_kib
+    parallelism = settings.password_argon2_parallelism
+    time_cost = calibrate(
+        range(1, 21),
+        lambda cost: argon2.using(type="ID", time_cost=cost, memory_cost=memory_kib, parallelism=parallelism),
+        budget,
+        args.samples,
+        "time_cost",
+    )
+    if time_cost is None:
+        print(f"❌ One pass over {memory_kib} KiB exceeds the budget; lower PASSWORD_ARGON2_MEMORY_KIB")
+        return 1
+    print("\n✅ Suggested settings:")
+    print("PASSWORD_HASH_SCHEME=argon2")
+    print(f"PASSWORD_ARGON2_TIME_COST={time_cost}")
+    print(f"PASSWORD_ARGON2_MEMORY_KIB={memory_kib}")
+    print(f"PASSWORD_ARGON2_PARALLELISM={parallelism}")
+    print(f"# Peak hashing memory: {memory_kib * settings.password_hash_workers // 1024} MiB "
+          f"({settings.password_hash_workers} workers)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
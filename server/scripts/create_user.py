@@ -26,11 +26,13 @@ try:
     from src.core.database import postgres_engine, AsyncSessionLocal
     from src.repositories.users import UserRepository
     from src.core.auth import get_password_hash
+    from src.core.user_import import import_users
 except ImportError:
     sys.path.insert(0, '/app')
     from src.core.database import postgres_engine, AsyncSessionLocal
     from src.repositories.users import UserRepository
     from src.core.auth import get_password_hash
+    from src.core.user_import import import_users
 
 
 async def create_user(email: str, password: str):
@@ -101,20 +103,66 @@ async def list_users():
             print(f"❌ Error listing users: {str(e)}")
 
 
+async def read_lines(path: str):
+    """Yield lines from a file one at a time so large files are never fully loaded"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            yield line
+
+
+async def bulk_import(path: str, input_format: str | None = None):
+    """Import users from a JSONL or CSV file"""
+    if not os.path.isfile(path):
+        print(f"❌ Error: File not found: {path}")
+        return False
+
+    input_format = input_format or ("csv" if path.lower().endswith(".csv") else "jsonl")
+    if input_format not in ("jsonl", "csv"):
+        print(f"❌ Error: Unsupported format '{input_format}' (use jsonl or csv)")
+        return False
+
+    async with AsyncSessionLocal() as session:
+        user_repo = UserRepository(session)
+
+        try:
+            result = await import_users(read_lines(path), input_format, user_repo)
+        except Exception as e:
+            print(f"❌ Error importing users: {str(e)}")
+            return False
+
+    print("✅ Import finished:")
+    print(f"   Created:   {result.created}")
+    print(f"   Conflicts: {result.conflicts}")
+    print(f"   Invalid:   {result.invalid}")
+    for error in result.errors:
+        print(f"   line {error.line}: {error.email or '-'}: {error.reason}")
+    if result.errors_truncated:
+        print("   (more errors not shown)")
+
+    return result.invalid == 0
+
+
 def print_usage():
     """Print usage instructions"""
     print("Usage:")
     print("  python scripts/create_user.py <email> <password>  - Create a new registered user")
     print("  python scripts/create_user.py --list              - List all users")
+    print("  python scripts/create_user.py --import <file> [jsonl|csv]")
+    print("                                                    - Bulk import users from a file")
     print("  python scripts/create_user.py --help              - Show this help")
     print("\nExamples:")
     print("  python scripts/create_user.py user@example.com mypassword123")
     print("  python scripts/create_user.py admin@company.com securepass456")
     print("  python scripts/create_user.py --list")
+    print("  python scripts/create_user.py --import users.jsonl")
+    print("  python scripts/create_user.py --import users.csv csv")
     print("\nNote:")
     print("  - Password must be at least 6 characters long")
     print("  - New users get 100 tokens as a welcome bonus")
     print("  - Users are created as registered (not superuser)")
+    print('  - JSONL files have one {"email": ..., "password": ...} object per line')
+    print("  - CSV files need an 'email,password' header row")
+    print("  - Existing emails are reported as conflicts and skipped")
 
 
 async def main():
@@ -128,6 +176,14 @@ async def main():
     elif sys.argv[1] in ['--list', '-l']:
         await list_users()
         sys.exit(0)
+    elif sys.argv[1] in ['--import', '-i']:
+        if len(sys.argv) not in (3, 4):
+            print("❌ Error: --import needs a file path")
+            print()
+            print_usage()
+            sys.exit(1)
+        success = await bulk_import(sys.argv[2], sys.argv[3] if len(sys.argv) == 4 else None)
+        sys.exit(0 if success else 1)
     elif len(sys.argv) != 3:
         print("❌ Error: Both email and password are required")
         print()
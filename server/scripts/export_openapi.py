@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Script to write the OpenAPI schema to a file, to be served via OPENAPI_SCHEMA_PATH.
+Usage: python scripts/export_openapi.py [output_path]   (default: openapi.json)
+
+Run it with the same settings as the server (METRICS_ENABLED in particular changes the routes)
+and regenerate it whenever the API changes.
+"""
+
+import json
+import os
+import sys
+
+# Add the src directory to Python path - handle both local and Docker environments
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+if os.path.exists('/app/src'):
+    sys.path.insert(0, '/app')
+
+# Generate the schema rather than echo a previously exported one (src.main builds the app on import)
+os.environ["OPENAPI_SCHEMA_PATH"] = ""
+
+from src.main import create_app  # noqa: E402
+
+
+def main():
+    output_path = sys.argv[1] if len(sys.argv) > 1 else "openapi.json"
+    schema = create_app().openapi()
+    with open(output_path, "w") as f:
+        json.dump(schema, f, indent=2)
+        f.write("\n")
+    print(f"✅ Wrote OpenAPI schema for {len(schema['paths'])} paths to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -58,14 +58,18 @@ async def make_superuser(user_identifier: str):
                 return True
             
             # Update user to superuser
+            from datetime import UTC, datetime
             from sqlalchemy import update
             from src.models.postgres.models import UserModel
+            from src.repositories.revoked_tokens import RevokedTokenRepository
             
             await session.execute(
                 update(UserModel)
                 .where(UserModel.id == user.id)
                 .values(is_superuser=True)
             )
+            # Outstanding tokens still carry the old role; servers in stateless auth mode reject them
+            await RevokedTokenRepository(session).revoke(user.id, datetime.now(UTC))
             
             await session.commit()
             
@@ -1,10 +1,7 @@
-from fastapi import APIRouter, Depends, status
-from fastapi.responses import JSONResponse
-from sqlalchemy import text
-from sqlalchemy.ext.asyncio import AsyncSession
-from src.core.database import get_postgres_session
-from src.schemas.health import HealthResponse
-from starlette.responses import Response
+from fastapi import APIRouter, status
+from src.core.health import db_health_monitor
+from src.core.responses import ModelResponse
+from src.schemas.health import HealthResponse, PoolUsageResponse, ReadinessResponse
 
 router = APIRouter()
 
@@ -19,15 +16,24 @@ async def health_check() -> HealthResponse:
     return HealthResponse(status="healthy")
 
 
-@router.get("/ready", response_model=None)
-async def readiness_check(
-    session: AsyncSession = Depends(get_postgres_session),
-) -> Response:
-    try:
-        await session.execute(text("SELECT 1"))
-        return JSONResponse(content={"status": "ready", "database": "connected"})
-    except Exception:
-        return JSONResponse(
+@router.get("/ready", response_model=ReadinessResponse)
+async def readiness_check() -> ModelResponse:
+    """Answers from the background health monitor's last result, without touching the database"""
+    health = db_health_monitor.current()
+    if health is None:
+        return ModelResponse(
+            ReadinessResponse(status="not_ready", database="unknown"),
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            content={"status": "not_ready", "database": "disconnected"},
         )
+
+    response = ReadinessResponse(
+        status="ready" if health.healthy else "not_ready",
+        database="connected" if health.healthy else "disconnected",
+        checked_at=health.checked_at,
+        age_seconds=round(health.age_seconds, 3),
+        db_latency_ms=health.latency_ms,
+        pool=PoolUsageResponse(**vars(health.pool)) if health.pool else None,
+    )
+    return ModelResponse(
+        response, status_code=status.HTTP_200_OK if health.healthy else status.HTTP_503_SERVICE_UNAVAILABLE
+    )
@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Response
+from src.core.config import settings
+from src.core.jwt_keys import key_ring
+
+router = APIRouter()
+
+
+@router.get("/.well-known/jwks.json")
+async def jwks() -> Response:
+    """Public keys that verify access tokens, for services that check tokens themselves (empty with HS*)"""
+    return Response(
+        content=key_ring().jwks_json,
+        media_type="application/json",
+        headers={"Cache-Control": f"public, max-age={settings.jwks_max_age_seconds}"},
+    )
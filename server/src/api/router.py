@@ -1,7 +1,9 @@
 from fastapi import APIRouter
 from src.api.endpoints.health import router as health_router
+from src.api.endpoints.jwks import router as jwks_router
 from src.api.users import router as users_router
 
 router = APIRouter()
 router.include_router(health_router, tags=["health"])
+router.include_router(jwks_router, tags=["auth"])
 router.include_router(users_router)
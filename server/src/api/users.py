@@ -1,21 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.ext.asyncio import AsyncSession
+import base64
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
+from typing import Literal
+from uuid import UUID
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from src.core.auth import (
+    aget_password_hash,
+    averify_password,
     create_token_for_user,
     get_current_superuser,
     get_current_user,
-    get_password_hash,
-    verify_password,
+    is_anonymous_token,
+    new_anonymous_user,
+    password_needs_rehash,
+    rehash_password,
 )
-from src.core.database import get_postgres_session
+from src.core.config import settings
+from src.core.database import get_postgres_read_session, get_postgres_session, get_session_factory
+from src.core.exceptions import AppError
+from src.core.rate_limit import enforce_rate_limit, rate_limit
+from src.core.responses import ModelResponse
+from src.core.user_import import ImportFormat, import_users, iter_lines
 from src.models.postgres.users import UserModel
 from src.repositories.users import UserRepository
 from src.schemas.users import (
+    BulkImportResponse,
     CreateUserRequest,
     CreateUserResponse,
     DeleteUserRequest,
     DeleteUserResponse,
     TokenResponse,
+    UserListResponse,
     UserLoginRequest,
     UserRegisterRequest,
     UserResponse,
@@ -28,44 +49,147 @@ def get_user_repository(postgres_session: AsyncSession = Depends(get_postgres_se
     return UserRepository(postgres_session)
 
 
-@router.post("/", response_model=TokenResponse)
-async def create_user(user_repo: UserRepository = Depends(get_user_repository)) -> TokenResponse:
+def get_read_user_repository(
+    postgres_session: AsyncSession = Depends(get_postgres_read_session),
+) -> UserRepository:
+    """Repository for reads that tolerate replication lag; never write through it"""
+    return UserRepository(postgres_session)
+
+
+def encode_cursor(user: UserModel) -> str:
+    raw = json.dumps([user.created_at.isoformat(), str(user.id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        created_at, user_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), UUID(user_id)
+    except (ValueError, TypeError) as e:
+        raise AppError(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from e
+
+
+async def _export_chunks(
+    batches: AsyncIterator[Sequence[UserModel]], export_format: Literal["ndjson", "csv"]
+) -> AsyncIterator[str]:
+    """Serialize users one database batch at a time, so memory stays flat however many rows there are"""
+    fields = list(UserResponse.model_fields)
+    if export_format == "csv":
+        yield ",".join(fields) + "\r\n"
+
+    async for batch in batches:
+        if export_format == "ndjson":
+            yield "".join(UserResponse.model_validate(user).model_dump_json() + "\n" for user in batch)
+        else:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for user in batch:
+                row = UserResponse.model_validate(user).model_dump(mode="json")
+                writer.writerow(["" if row[field] is None else row[field] for field in fields])
+            yield buffer.getvalue()
+
+
+@router.get("/", response_model=UserListResponse)
+async def list_users(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = None,
+    current_superuser: UserModel = Depends(get_current_superuser),
+    user_repo: UserRepository = Depends(get_read_user_repository),
+) -> ModelResponse:
+    """Superuser endpoint to page through users ordered by creation time, using keyset pagination"""
+    after = decode_cursor(cursor) if cursor else None
+    users = await user_repo.list_users(limit + 1, after)
+    page = users[:limit]
+    return ModelResponse(
+        UserListResponse(
+            items=[UserResponse.model_validate(user) for user in page],
+            next_cursor=encode_cursor(page[-1]) if len(users) > limit else None,
+        )
+    )
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_users(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    current_superuser: UserModel = Depends(get_current_superuser),
+    user_repo: UserRepository = Depends(get_read_user_repository),
+) -> StreamingResponse:
+    """Superuser endpoint to stream every user as NDJSON or CSV"""
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _export_chunks(user_repo.stream_users(settings.user_export_batch_size), export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="users.{export_format}"'},
+    )
+
+
+@router.post(
+    "/",
+    response_model=TokenResponse,
+    dependencies=[Depends(rate_limit("create_user", lambda: settings.rate_limit_create_user))],
+)
+async def create_user(user_repo: UserRepository = Depends(get_user_repository)) -> ModelResponse:
+    if settings.anonymous_users_lazy:
+        user = new_anonymous_user()
+        token = create_token_for_user(user, anonymous=True)
+        return ModelResponse(TokenResponse(access_token=token, user=UserResponse.model_validate(user)))
+
     user = await user_repo.create_user()
     token = create_token_for_user(user)
-    return TokenResponse(access_token=token, user=UserResponse.model_validate(user))
+    return ModelResponse(TokenResponse(access_token=token, user=UserResponse.model_validate(user)))
 
 
 @router.post("/register", response_model=TokenResponse)
 async def register_user(
     request: UserRegisterRequest,
     current_user: UserModel = Depends(get_current_user),
+    anonymous: bool = Depends(is_anonymous_token),
     user_repo: UserRepository = Depends(get_user_repository),
-) -> TokenResponse:
-    password_hash = get_password_hash(request.password)
-    registered_user = await user_repo.register_user(current_user.id, request.email, password_hash)
+) -> ModelResponse:
+    # get_current_user may have read the user through this session; hash without holding its connection
+    await user_repo.release()
+    password_hash = await aget_password_hash(request.password)
+    registered_user = await user_repo.register_user(
+        current_user.id, request.email, password_hash, create_missing=anonymous
+    )
     token = create_token_for_user(registered_user)
-    return TokenResponse(access_token=token, user=UserResponse.model_validate(registered_user))
+    return ModelResponse(TokenResponse(access_token=token, user=UserResponse.model_validate(registered_user)))
 
 
-@router.post("/login", response_model=TokenResponse)
+@router.post(
+    "/login",
+    response_model=TokenResponse,
+    dependencies=[Depends(rate_limit("login", lambda: settings.rate_limit_login))],
+)
 async def login_user(
-    request: UserLoginRequest, user_repo: UserRepository = Depends(get_user_repository)
-) -> TokenResponse:
+    request: UserLoginRequest,
+    background_tasks: BackgroundTasks,
+    user_repo: UserRepository = Depends(get_user_repository),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+) -> ModelResponse:
+    # Also per account, so guessing one user's password from many addresses is limited too
+    await enforce_rate_limit("login_email", request.email, settings.rate_limit_login_email)
     user = await user_repo.get_user_by_email(request.email)
+    # Verifying takes far longer than the query; nothing else here needs the connection
+    await user_repo.release()
 
     if not user or not user.is_verified:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password")
 
-    if not user.password_hash or not verify_password(request.password, user.password_hash):
+    if not user.password_hash or not await averify_password(request.password, user.password_hash):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password")
 
+    if settings.password_rehash_on_login and password_needs_rehash(user.password_hash):
+        # After the response, by which time the request's session is closed
+        background_tasks.add_task(rehash_password, session_factory, user.id, user.password_hash, request.password)
+
     token = create_token_for_user(user)
-    return TokenResponse(access_token=token, user=UserResponse.model_validate(user))
+    return ModelResponse(TokenResponse(access_token=token, user=UserResponse.model_validate(user)))
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: UserModel = Depends(get_current_user)) -> UserResponse:
-    return UserResponse.model_validate(current_user)
+async def get_current_user_info(current_user: UserModel = Depends(get_current_user)) -> ModelResponse:
+    return ModelResponse(UserResponse.model_validate(current_user))
 
 
 @router.post("/create-user", response_model=CreateUserResponse)
@@ -73,25 +197,39 @@ async def create_user_by_superuser(
     request: CreateUserRequest,
     current_superuser: UserModel = Depends(get_current_superuser),
     user_repo: UserRepository = Depends(get_user_repository),
-) -> CreateUserResponse:
+) -> ModelResponse:
     """Superuser endpoint to create a new registered user"""
-    password_hash = get_password_hash(request.password)
+    await user_repo.release()
+    password_hash = await aget_password_hash(request.password)
     created_user = await user_repo.create_registered_user(request.email, password_hash)
-    return CreateUserResponse(
-        success=True,
-        message=f"Successfully created user {created_user.email}",
-        user=UserResponse.model_validate(created_user),
+    return ModelResponse(
+        CreateUserResponse(
+            success=True,
+            message=f"Successfully created user {created_user.email}",
+            user=UserResponse.model_validate(created_user),
+        )
     )
 
 
+@router.post("/bulk-import", response_model=BulkImportResponse)
+async def bulk_import_users(
+    http_request: Request,
+    input_format: ImportFormat = Query("jsonl", alias="format"),
+    current_superuser: UserModel = Depends(get_current_superuser),
+    user_repo: UserRepository = Depends(get_user_repository),
+) -> ModelResponse:
+    """Superuser endpoint to import registered users from a streamed JSONL or CSV request body"""
+    return ModelResponse(await import_users(iter_lines(http_request.stream()), input_format, user_repo))
+
+
 @router.delete("/delete-user", response_model=DeleteUserResponse)
 async def delete_user_by_superuser(
     request: DeleteUserRequest,
     current_superuser: UserModel = Depends(get_current_superuser),
     user_repo: UserRepository = Depends(get_user_repository),
-) -> DeleteUserResponse:
+) -> ModelResponse:
     """Superuser endpoint to delete a user by email or UUID"""
     deleted_user = await user_repo.delete_user(request.user_identifier, current_superuser.id)
-    return DeleteUserResponse(
-        success=True, message=f"Successfully deleted user {deleted_user.email or deleted_user.id}"
+    return ModelResponse(
+        DeleteUserResponse(success=True, message=f"Successfully deleted user {deleted_user.email or deleted_user.id}")
     )
@@ -1,28 +1,128 @@
+import hashlib
+import importlib.util
+import time
 from datetime import UTC, datetime, timedelta
-from uuid import UUID
+from functools import lru_cache
+from typing import TYPE_CHECKING
+from uuid import UUID, uuid4
 
+import structlog
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from src.core.cache import principal_cache, token_cache
 from src.core.config import settings
-from src.core.database import get_postgres_session
+from src.core.database import get_postgres_session, replica_router
+from src.core.executor import BoundedExecutor
+from src.core.jwt_keys import key_ring
+from src.core.metrics import password_hash_duration_seconds, password_hash_queue_depth
+from src.core.revocation import revoked_before_seconds, token_revocation_list
 from src.models.postgres import UserModel
+from src.repositories.revoked_tokens import RevokedTokenRepository
 from src.repositories.users import UserRepository
 
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+logger = structlog.get_logger()
 security = HTTPBearer(auto_error=False)
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+password_hasher = BoundedExecutor(
+    "password-hash",
+    max_workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_queue_size,
+    queue_depth=password_hash_queue_depth,
+)
+
+
+# jose and passlib are imported on first use rather than at startup; together they take
+# about 80 ms to import, which every worker would otherwise pay before serving a request.
+
+
+@lru_cache(maxsize=4)
+def _build_pwd_context(
+    scheme: str, bcrypt_rounds: int, argon2_time_cost: int, argon2_memory_kib: int, argon2_parallelism: int
+) -> "CryptContext":
+    if scheme == "argon2" and importlib.util.find_spec("argon2") is None:
+        raise RuntimeError("password_hash_scheme=argon2 needs argon2-cffi, install the argon2 extra")
+
+    from passlib.context import CryptContext
+
+    # The configured scheme hashes; the other one only verifies, and its hashes count as stale
+    schemes = [scheme] + [other for other in ("bcrypt", "argon2") if other != scheme]
+    return CryptContext(
+        schemes=schemes,
+        deprecated="auto",
+        # Desired rounds equal to the configured ones make any other cost stale as well
+        bcrypt__rounds=bcrypt_rounds,
+        bcrypt__min_desired_rounds=bcrypt_rounds,
+        bcrypt__max_desired_rounds=bcrypt_rounds,
+        argon2__type="ID",
+        argon2__time_cost=argon2_time_cost,
+        argon2__memory_cost=argon2_memory_kib,
+        argon2__parallelism=argon2_parallelism,
+    )
+
+
+def pwd_context() -> "CryptContext":
+    return _build_pwd_context(
+        settings.password_hash_scheme,
+        settings.password_bcrypt_rounds,
+        settings.password_argon2_time_cost,
+        settings.password_argon2_memory_kib,
+        settings.password_argon2_parallelism,
+    )
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against its hash"""
-    return bool(pwd_context.verify(plain_password, hashed_password))
+    return bool(pwd_context().verify(plain_password, hashed_password))
 
 
 def get_password_hash(password: str) -> str:
     """Generate password hash"""
-    return str(pwd_context.hash(password))
+    return str(pwd_context().hash(password))
+
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool, keeping bcrypt off the event loop"""
+    with password_hash_duration_seconds.labels(operation="verify").time():
+        return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+
+async def aget_password_hash(password: str, wait: bool = False) -> str:
+    """
+    Hash a password on the hashing pool, keeping bcrypt off the event loop. With ``wait``, a full
+    queue is waited out instead of rejected with a 503.
+    """
+    with password_hash_duration_seconds.labels(operation="hash").time():
+        return await password_hasher.run(get_password_hash, password, wait=wait)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Whether a hash uses another scheme or cost than ``password_hash_scheme`` is configured with"""
+    return bool(pwd_context().needs_update(hashed_password))
+
+
+async def rehash_password(
+    session_factory: async_sessionmaker[AsyncSession], user_id: UUID, old_hash: str, password: str
+) -> None:
+    """
+    Replace a stale hash with one of the current scheme and cost, after the password was verified.
+
+    Meant to run as a background task after the login response, so it opens a session of its own
+    once the hash is ready: failures (including a busy hashing pool) are only logged, and the next
+    login tries again.
+    """
+    try:
+        new_hash = await aget_password_hash(password)
+        async with session_factory() as session:
+            replaced = await UserRepository(session).replace_password_hash(user_id, old_hash, new_hash)
+    except Exception:
+        logger.warning("password_rehash_failed", user_id=str(user_id), exc_info=True)
+        return
+    if replaced:
+        logger.info("password_rehashed", user_id=str(user_id))
 
 
 def create_access_token(data: dict[str, object], expires_delta: timedelta | None = None) -> str:
@@ -33,40 +133,169 @@ def create_access_token(data: dict[str, object], expires_delta: timedelta | None
     else:
         expire = datetime.now(UTC) + timedelta(minutes=settings.jwt_expire_minutes)
 
-    to_encode.update({"exp": expire})
-    encoded_jwt: str = jwt.encode(to_encode, settings.secret_key, algorithm=settings.jwt_algorithm)
+    to_encode.update({"exp": expire, "iat": datetime.now(UTC)})
+    from jose import jwt
+
+    ring = key_ring()
+    signing_key = ring.signing_key()
+    headers = {"kid": signing_key.kid} if signing_key.kid is not None else None
+    encoded_jwt: str = jwt.encode(to_encode, signing_key.key, algorithm=ring.algorithm, headers=headers)
     return encoded_jwt
 
 
-def create_token_for_user(user: UserModel) -> str:
+def create_token_for_user(user: UserModel, anonymous: bool = False) -> str:
     token_data: dict[str, object] = {
         "sub": str(user.id),
         "email": user.email,
         "is_verified": user.is_verified,
         "is_superuser": user.is_superuser,
+        "created_at": user.created_at.isoformat(),
     }
+    if anonymous:
+        # The user has no row yet; the claims are the principal until it registers
+        token_data["anonymous"] = True
     return create_access_token(token_data)
 
 
+def new_anonymous_user() -> UserModel:
+    """A transient anonymous user, for issuing a token without inserting a row (``anonymous_users_lazy``)"""
+    return UserModel(id=uuid4(), email=None, is_verified=False, is_superuser=False, created_at=datetime.now(UTC))
+
+
+def _token_cache_key(token: str) -> bytes:
+    # Keyed on the verification keys too, so that after a key change no token is accepted unverified
+    return hashlib.sha256(key_ring().fingerprint + token.encode()).digest()
+
+
+def decode_jwt_payload(token: str) -> tuple[UUID, dict[str, object]] | None:
+    """
+    Verify a JWT and return its subject and claims, or None if it is not valid.
+
+    Valid tokens are remembered in ``token_cache`` until their ``exp`` at the latest, so a client
+    repeating the same bearer token skips the signature check and parsing. The claims are shared
+    between requests and must not be modified.
+    """
+    if not token_cache.enabled:
+        return _verify_jwt(token)
+
+    cache_key = _token_cache_key(token)
+    cached = token_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    decoded = _verify_jwt(token)
+    if decoded is not None:
+        expires_at = decoded[1].get("exp")
+        if isinstance(expires_at, int | float):
+            token_cache.set(cache_key, decoded, ttl_seconds=expires_at - time.time())
+    return decoded
+
+
+def _verify_jwt(token: str) -> tuple[UUID, dict[str, object]] | None:
+    from jose import JWTError, jwt
+
+    ring = key_ring()
+    try:
+        kid = jwt.get_unverified_header(token).get("kid") if ring.asymmetric else None
+        key = ring.verification_key(kid)
+        if key is None:
+            return None
+        payload: dict[str, object] = jwt.decode(token, key, algorithms=[ring.algorithm])
+    except JWTError:
+        return None
+
+    user_id_str = payload.get("sub")
+    if not isinstance(user_id_str, str):
+        return None
+
+    try:
+        return UUID(user_id_str), payload
+    except ValueError:
+        return None
+
+
 def decode_jwt_token(token: str) -> tuple[bool, UUID | None, str | None]:
     """
     Decode JWT token and extract user ID
     Returns: (success, user_id, error_message)
     """
-    try:
-        payload: dict[str, object] = jwt.decode(token, settings.secret_key, algorithms=[settings.jwt_algorithm])
-        user_id_str = payload.get("sub")
+    decoded = decode_jwt_payload(token)
+    if decoded is None:
+        return False, None, "Could not validate credentials"
+    return True, decoded[0], None
 
-        if not isinstance(user_id_str, str):
-            return False, None, "Could not validate credentials"
 
-        user_id = UUID(user_id_str)
-        return True, user_id, None
+def user_from_claims(user_id: UUID, claims: dict[str, object]) -> UserModel | None:
+    """
+    Build the principal from verified token claims (stateless auth mode).
+    Returns None for tokens issued before all the needed claims were embedded.
+    """
+    email = claims.get("email")
+    is_verified = claims.get("is_verified")
+    is_superuser = claims.get("is_superuser")
+    created_at = claims.get("created_at")
+    if not (
+        (email is None or isinstance(email, str))
+        and isinstance(is_verified, bool)
+        and isinstance(is_superuser, bool)
+        and isinstance(created_at, str)
+    ):
+        return None
 
-    except JWTError:
-        return False, None, "Could not validate credentials"
+    try:
+        created = datetime.fromisoformat(created_at)
     except ValueError:
-        return False, None, "Could not validate credentials"
+        return None
+
+    return UserModel(id=user_id, email=email, is_verified=is_verified, is_superuser=is_superuser, created_at=created)
+
+
+def _snapshot_user(user: UserModel) -> dict[str, object]:
+    return {attr.key: getattr(user, attr.key) for attr in inspect(UserModel).column_attrs}
+
+
+async def load_user(user_id: UUID, postgres_session: AsyncSession, use_replica: bool = False) -> UserModel | None:
+    """
+    Load a user by ID, going through the principal cache.
+
+    Cache hits are rebuilt as transient ``UserModel`` instances so that concurrent requests never share
+    (or mutate) the same object. With ``use_replica``, misses are read from a replica first and from
+    the primary only if the replica does not have the user yet.
+    """
+    snapshot = principal_cache.get(user_id)
+    if snapshot is not None:
+        return UserModel(**snapshot)
+
+    user = None
+    if use_replica:
+        async with replica_router.session() as replica_session:
+            if replica_session is not None:
+                user = await UserRepository(replica_session).get_user(user_id)
+    if user is None:
+        user = await UserRepository(postgres_session).get_user(user_id)
+
+    if user is not None:
+        principal_cache.set(user_id, _snapshot_user(user))
+    return user
+
+
+def _issued_recently(claims: dict[str, object]) -> bool:
+    # Tokens are issued right after the write that produced them (create, register, login)
+    issued_at = claims.get("iat")
+    if not isinstance(issued_at, int):
+        return False
+    return datetime.now(UTC).timestamp() - issued_at < settings.db_replica_sticky_seconds
+
+
+async def _anonymous_token_revoked(user_id: UUID, claims: dict[str, object], postgres_session: AsyncSession) -> bool:
+    # The user has no row; if it was deleted, the revocation is all that is left of it
+    issued_at = claims.get("iat")
+    if not isinstance(issued_at, int):
+        return True
+    if token_revocation_list.is_revoked(user_id, issued_at):
+        return True
+    revoked_before = await RevokedTokenRepository(postgres_session).get_revoked_before(user_id)
+    return revoked_before is not None and issued_at < revoked_before_seconds(revoked_before)
 
 
 async def validate_user_from_token(
@@ -76,12 +305,29 @@ async def validate_user_from_token(
     Validate JWT token and return user
     Returns: (success, user, error_message)
     """
-    success, user_id, error = decode_jwt_token(token)
-    if not success or user_id is None:
-        return False, None, error
+    decoded = decode_jwt_payload(token)
+    if decoded is None:
+        return False, None, "Could not validate credentials"
+    user_id, claims = decoded
+
+    if settings.auth_stateless:
+        issued_at = claims.get("iat")
+        if isinstance(issued_at, int) and token_revocation_list.is_revoked(user_id, issued_at):
+            return False, None, "Token has been revoked"
 
-    user_repo = UserRepository(postgres_session)
-    user = await user_repo.get_user(user_id)
+        user = user_from_claims(user_id, claims)
+        if user is not None:
+            return True, user, None
+
+    user = await load_user(user_id, postgres_session, use_replica=not _issued_recently(claims))
+
+    if user is None and claims.get("anonymous") is True:
+        if await _anonymous_token_revoked(user_id, claims, postgres_session):
+            return False, None, "Token has been revoked"
+        user = user_from_claims(user_id, claims)
+        if user is not None:
+            # Spare the database a lookup per request until the row exists; register invalidates this
+            principal_cache.set(user_id, _snapshot_user(user))
 
     if user is None:
         return False, None, "Could not validate credentials"
@@ -113,6 +359,12 @@ async def get_current_user(
     return user
 
 
+async def is_anonymous_token(credentials: HTTPAuthorizationCredentials | None = Depends(security)) -> bool:
+    """Whether the request's token was issued to a lazy anonymous user, which has no row until it registers"""
+    decoded = decode_jwt_payload(credentials.credentials) if credentials else None
+    return decoded is not None and decoded[1].get("anonymous") is True
+
+
 async def get_current_user_id(user: UserModel = Depends(get_current_user)) -> UUID:
     """Get the current user ID (for backward compatibility)"""
     return user.id
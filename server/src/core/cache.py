@@ -0,0 +1,77 @@
+import time
+from collections import OrderedDict
+from uuid import UUID
+
+from src.core.config import settings
+from src.core.metrics import cache_evictions_total, cache_hits_total, cache_misses_total
+
+
+class TTLCache[K, V]:
+    """
+    Bounded in-process LRU cache whose entries also expire after a TTL.
+
+    Not shared between worker processes, so anything cached here may be stale for up to
+    ``ttl_seconds`` after a change made elsewhere. A size or TTL of zero disables caching.
+    """
+
+    def __init__(self, name: str, max_size: int, ttl_seconds: float) -> None:
+        self.name = name
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl_seconds > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> V | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            cache_misses_total.labels(cache=self.name).inc()
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            cache_evictions_total.labels(cache=self.name, reason="expired").inc()
+            cache_misses_total.labels(cache=self.name).inc()
+            return None
+
+        self._entries.move_to_end(key)
+        cache_hits_total.labels(cache=self.name).inc()
+        return value
+
+    def set(self, key: K, value: V, ttl_seconds: float | None = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        if not self.enabled or ttl <= 0:
+            return
+
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            cache_evictions_total.labels(cache=self.name, reason="size").inc()
+
+    def invalidate(self, key: K) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+# Column values of recently authenticated users, keyed by user id
+principal_cache: TTLCache[UUID, dict[str, object]] = TTLCache(
+    "principal",
+    max_size=settings.principal_cache_max_size,
+    ttl_seconds=settings.principal_cache_ttl_seconds,
+)
+
+# Subject and claims of recently verified tokens, keyed by a digest of the signing key and token
+token_cache: TTLCache[bytes, tuple[UUID, dict[str, object]]] = TTLCache(
+    "token",
+    max_size=settings.token_cache_max_size,
+    ttl_seconds=settings.token_cache_ttl_seconds,
+)
@@ -1,23 +1,130 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class JwtSigningKey(BaseModel):
+    """A private key in ``jwt_signing_keys``, see ``src/core/jwt_keys.py``"""
+
+    model_config = ConfigDict(frozen=True)
+
+    kid: str
+    private_key_file: Path
+    # Signs new tokens from this time on (until a newer key becomes active); None means always
+    active_from: datetime | None = None
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", case_sensitive=False, extra="ignore")
 
     app_name: str = "WebApp"
     log_level: str = "info"
+    log_queue_max_size: int = 10_000
+    log_queue_overflow: Literal["drop", "block"] = "drop"
     cors_origins: list[str] = ["http://localhost:5746"]
     metrics_enabled: bool = True
+    # Serve /docs, /redoc and /openapi.json; a pre-generated schema file avoids building it at runtime
+    docs_enabled: bool = True
+    openapi_schema_path: str | None = None
+
+    server_host: str = "0.0.0.0"
+    server_port: int = 8000
+    # Worker processes started by ``python -m src.serve``; 0 starts one per available CPU
+    server_workers: int = 1
+    # Proxies trusted to set X-Forwarded-For, which then becomes the client address
+    forwarded_allow_ips: str = "127.0.0.1"
 
     postgres_user: str = "postgres"
     postgres_password: str = "password"
     postgres_host: str = "localhost"
     postgres_port: int = 5432
     postgres_db: str = "webapp"
+    # Read-only replicas as full SQLAlchemy URLs (postgresql+asyncpg://...); empty sends all reads to the primary
+    postgres_replica_urls: list[str] = []
+    # A replica that fails to connect is skipped for this long before being tried again
+    db_replica_retry_seconds: float = 30.0
+    # Tokens issued more recently than this are served from the primary, so a client sees its own writes
+    db_replica_sticky_seconds: float = 10.0
+
+    # /ready answers from a background check run every interval; older results count as not ready
+    health_check_interval_seconds: float = 5.0
+    health_check_timeout_seconds: float = 2.0
+    health_check_max_staleness_seconds: float = 15.0
+
+    db_pool_size: int = 20
+    db_max_overflow: int = 10
+    # Seconds a request waits for a free connection before failing
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 300
+    db_echo: bool = False
+    # Statements slower than this are logged with their SQL; 0 disables the slow-query log
+    db_slow_query_threshold_ms: float = 200.0
+    # Prepared statements kept per connection by SQLAlchemy's asyncpg adapter; 0 disables the cache
+    db_statement_cache_size: int = 100
+    # Connecting through PgBouncer in transaction mode: statement caches are disabled and statements
+    # get unique names, since consecutive transactions may run on different server connections
+    db_pgbouncer: bool = False
+    # Connections opened before startup completes (at most db_pool_size), each primed with the hot
+    # user lookups unless disabled, so the first requests after a deploy do not pay for connecting
+    db_pool_warm_up_connections: int = 5
+    db_pool_warm_up_prime_statements: bool = True
+    # On shutdown, requests already in progress get this long to finish before connections are closed
+    shutdown_drain_timeout_seconds: float = 30.0
 
     secret_key: str
+    # HS* algorithms sign with secret_key, which only this service can verify with. Asymmetric ones
+    # (ES256) sign with jwt_signing_keys and publish the public keys at /.well-known/jwks.json
     jwt_algorithm: str = "HS256"
+    jwt_signing_keys: list[JwtSigningKey] = []
+    # How long clients may cache the JWKS; publish a new key at least this long before its active_from
+    jwks_max_age_seconds: int = 3600
     jwt_expire_minutes: int = 24 * 60
+    # Serve the principal from verified token claims instead of loading it from the database
+    auth_stateless: bool = False
+    auth_revocation_refresh_seconds: float = 30.0
+
+    password_hash_workers: int = 4
+    password_hash_queue_size: int = 64
+    # argon2 needs the argon2 extra (argon2-cffi). Hashes of the other scheme still verify
+    password_hash_scheme: Literal["bcrypt", "argon2"] = "bcrypt"
+    # Pick costs for the deployment CPU with scripts/calibrate_password_hash.py
+    password_bcrypt_rounds: int = 12
+    # argon2id; each hash in flight holds argon2_memory_kib, up to password_hash_workers at once
+    password_argon2_time_cost: int = 3
+    password_argon2_memory_kib: int = 64 * 1024
+    password_argon2_parallelism: int = 1
+    # After a successful login, re-hash in the background if the stored hash uses another scheme or cost
+    password_rehash_on_login: bool = True
+
+    principal_cache_ttl_seconds: float = 30.0
+    principal_cache_max_size: int = 10_000
+    # Verified token claims, keyed by token digest; entries never outlive the token's exp
+    token_cache_ttl_seconds: float = 300.0
+    token_cache_max_size: int = 10_000
+
+    # Token buckets as "<count>/<second|minute|hour|day>"; login is limited per client IP and per email
+    rate_limit_enabled: bool = True
+    rate_limit_max_keys: int = 100_000
+    rate_limit_login: str = "20/minute"
+    rate_limit_login_email: str = "5/minute"
+    rate_limit_create_user: str = "30/hour"
+
+    # Issue tokens to anonymous visitors without inserting a row; the row is created on register
+    anonymous_users_lazy: bool = False
+    # Unverified users (never registered) older than this are permanently deleted in the background.
+    # Off by default (0); opt in with e.g. 30 once anonymous users are known to be disposable
+    prune_unverified_after_days: float = 0.0
+    prune_interval_seconds: float = 3600.0
+    prune_batch_size: int = 500
+    # Pause between batches so pruning never holds locks or I/O for long
+    prune_batch_pause_seconds: float = 0.1
+
+    bulk_import_batch_size: int = 1000
+    bulk_import_max_reported_errors: int = 1000
+    user_export_batch_size: int = 1000
 
     @property
     def is_debug(self) -> bool:
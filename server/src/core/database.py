@@ -1,26 +1,306 @@
-from collections.abc import AsyncIterator
+import asyncio
+import re
+import time
+import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+import structlog
+from fastapi import Depends
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, ExceptionContext
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, QueuePool
 
 from .config import settings
+from .metrics import (
+    db_pool_checked_out,
+    db_pool_checkout_wait_seconds,
+    db_pool_connection_held_seconds,
+    db_pool_idle,
+    db_pool_overflow,
+    db_replica_fallbacks_total,
+)
+
+logger = structlog.get_logger()
 
 
 class Base(DeclarativeBase):
     pass
 
 
-postgres_engine = create_async_engine(
-    settings.postgres_url,
-    echo=settings.is_debug,
-    pool_size=20,
-    max_overflow=10,
-    pool_pre_ping=True,
-    pool_recycle=300,
-)
+@dataclass
+class QueryStats:
+    """Statements executed on behalf of one request"""
+
+    count: int = 0
+    total_seconds: float = 0.0
+    slowest_seconds: float = 0.0
+
+    def record(self, elapsed: float) -> None:
+        self.count += 1
+        self.total_seconds += elapsed
+        self.slowest_seconds = max(self.slowest_seconds, elapsed)
+
+
+_query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Collect stats for every statement executed in the current context until exit"""
+    stats = QueryStats()
+    token = _query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _before_cursor_execute(conn: Connection, cursor: Any, statement: str, *args: Any) -> None:
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn: Connection, cursor: Any, statement: str, *args: Any) -> None:
+    _finish_query(conn, statement)
+
+
+def _handle_error(context: ExceptionContext) -> None:
+    if context.connection is not None and context.statement is not None:
+        _finish_query(context.connection, context.statement)
+
+
+def _finish_query(conn: Connection, statement: str) -> None:
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.record(elapsed)
+
+    threshold = settings.db_slow_query_threshold_ms
+    if threshold and elapsed * 1000 >= threshold:
+        # Parameters are bound separately, so the statement text carries no values
+        logger.warning("slow_query", sql=_WHITESPACE.sub(" ", statement).strip(), duration=round(elapsed, 4))
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Attach the statement timing hooks feeding ``track_queries`` and the slow-query log"""
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that exports its occupancy, how long checkouts wait for a connection and how long
+    connections are then held.
+
+    Metrics are labelled with the pool's ``logging_name`` (``pool_logging_name`` on the engine).
+    """
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        finally:
+            now = time.perf_counter()
+            db_pool_checkout_wait_seconds.labels(self._metrics_label).observe(now - start)
+            self._update_gauges()
+        record.info["checked_out_at"] = now
+        return record
+
+    def _do_return_conn(self, record: ConnectionPoolEntry) -> None:
+        checked_out_at = record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            db_pool_connection_held_seconds.labels(self._metrics_label).observe(time.perf_counter() - checked_out_at)
+        super()._do_return_conn(record)
+        self._update_gauges()
+
+    @property
+    def _metrics_label(self) -> str:
+        return self.logging_name or "default"
+
+    def _update_gauges(self) -> None:
+        label = self._metrics_label
+        db_pool_checked_out.labels(label).set(self.checkedout())
+        db_pool_idle.labels(label).set(self.checkedin())
+        # overflow() counts down from -pool_size while the pool is still filling up
+        db_pool_overflow.labels(label).set(max(self.overflow(), 0))
+
+
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+def asyncpg_connect_args() -> dict[str, Any]:
+    """Statement caching arguments for asyncpg, see ``db_statement_cache_size`` and ``db_pgbouncer``"""
+    if settings.db_pgbouncer:
+        return {
+            # SQLAlchemy's cache and asyncpg's own; a cached statement may not exist on the next server connection
+            "prepared_statement_cache_size": 0,
+            "statement_cache_size": 0,
+            # asyncpg numbers statements per client connection, so names would collide on a shared server one
+            "prepared_statement_name_func": _unique_statement_name,
+        }
+    return {"prepared_statement_cache_size": settings.db_statement_cache_size}
+
+
+def create_engine(url: str, pool_name: str) -> AsyncEngine:
+    engine = create_async_engine(
+        url,
+        echo=settings.db_echo,
+        connect_args=asyncpg_connect_args(),
+        poolclass=InstrumentedQueuePool,
+        pool_logging_name=pool_name,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_pre_ping=True,
+        pool_recycle=settings.db_pool_recycle,
+    )
+    instrument_engine(engine)
+    return engine
+
+
+async def warm_up_pool(
+    session_factory: async_sessionmaker[AsyncSession],
+    connections: int,
+    prime: Callable[[AsyncSession], Awaitable[None]] | None = None,
+) -> int:
+    """
+    Open up to ``connections`` pool connections at once, run ``prime`` on each and return them to
+    the pool idle. Returns the number opened; failures are logged rather than raised, so that an
+    unreachable database shows up in ``/ready`` instead of preventing startup.
+    """
+    pool = session_factory.kw["bind"].pool
+    if isinstance(pool, QueuePool):
+        # Overflow connections are closed when returned, so warming beyond the pool size is wasted
+        connections = min(connections, pool.size())
+    sessions: list[AsyncSession] = []
+    opened = 0
+
+    async def open_one() -> None:
+        nonlocal opened
+        session = session_factory()
+        sessions.append(session)
+        await session.connection()
+        if prime is not None:
+            await prime(session)
+        opened += 1
+
+    try:
+        # Concurrently, and every session held until all are done, so each one gets its own connection
+        async with asyncio.timeout(settings.db_pool_timeout):
+            results = await asyncio.gather(*(open_one() for _ in range(connections)), return_exceptions=True)
+        errors = [result for result in results if isinstance(result, BaseException)]
+    except TimeoutError as e:
+        errors = [e]
+    finally:
+        for session in sessions:
+            await session.close()
+
+    if errors:
+        logger.warning("db_pool_warm_up_failed", opened=opened, error=str(errors[0]) or type(errors[0]).__name__)
+    return opened
+
+
+@dataclass
+class Replica:
+    engine: AsyncEngine
+    session_factory: async_sessionmaker[AsyncSession] = field(init=False)
+    down_until: float = 0.0
+
+    def __post_init__(self) -> None:
+        self.session_factory = async_sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+
+
+class ReplicaRouter:
+    """
+    Hands out sessions on read replicas, round robin.
+
+    A replica that cannot be connected to is skipped for ``db_replica_retry_seconds``. When no replica
+    is configured or reachable, ``session()`` yields None and the caller should read from the primary.
+    """
+
+    def __init__(self, engines: list[AsyncEngine]) -> None:
+        self.replicas = [Replica(engine) for engine in engines]
+        self._next = 0
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncSession | None]:
+        if not self.replicas:
+            yield None
+            return
+
+        for replica in self._candidates():
+            session = replica.session_factory()
+            try:
+                # Connect up front so an unreachable replica is detected here rather than mid-request
+                await session.connection()
+            except (SQLAlchemyError, OSError) as e:
+                await session.close()
+                replica.down_until = time.monotonic() + settings.db_replica_retry_seconds
+                logger.warning("replica_unavailable", pool=replica.engine.pool.logging_name, error=str(e))
+                continue
+
+            async with session:
+                yield session
+            return
+
+        db_replica_fallbacks_total.inc()
+        yield None
+
+    def _candidates(self) -> list[Replica]:
+        now = time.monotonic()
+        start = self._next
+        self._next = (self._next + 1) % len(self.replicas)
+        ordered = self.replicas[start:] + self.replicas[:start]
+        return [replica for replica in ordered if replica.down_until <= now]
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+postgres_engine = create_engine(settings.postgres_url, "primary")
 AsyncSessionLocal = async_sessionmaker(postgres_engine, class_=AsyncSession, expire_on_commit=False)
+replica_router = ReplicaRouter(
+    [create_engine(url, f"replica-{i}") for i, url in enumerate(settings.postgres_replica_urls)]
+)
+
+
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Sessions for work that outlives the request, such as background tasks, which must not reuse its session"""
+    return AsyncSessionLocal
 
 
 async def get_postgres_session() -> AsyncIterator[AsyncSession]:
     async with AsyncSessionLocal() as session:
         yield session
+
+
+async def get_postgres_read_session(
+    postgres_session: AsyncSession = Depends(get_postgres_session),
+) -> AsyncIterator[AsyncSession]:
+    """
+    Session for read-only work that tolerates replication lag.
+
+    Uses a replica when one is reachable and otherwise the request's primary session, which costs
+    nothing extra since sessions only check out a connection on first use.
+    """
+    async with replica_router.session() as session:
+        yield session if session is not None else postgres_session
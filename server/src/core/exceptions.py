@@ -33,9 +33,10 @@ class ForbiddenError(DomainError):
 
 
 class AppError(Exception):
-    def __init__(self, status_code: int, detail: str) -> None:
+    def __init__(self, status_code: int, detail: str, headers: dict[str, str] | None = None) -> None:
         self.status_code = status_code
         self.detail = detail
+        self.headers = headers
 
 
 # --- Exception handlers ---
@@ -45,6 +46,7 @@ async def app_exception_handler(request: Request, exc: AppError) -> JSONResponse
     return JSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.detail},
+        headers=exc.headers,
     )
 
 
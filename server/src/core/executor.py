@@ -0,0 +1,85 @@
+import asyncio
+import functools
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import status
+from prometheus_client import Gauge
+from src.core.exceptions import AppError
+
+
+class BoundedExecutor:
+    """
+    Thread pool for CPU-bound work that must not run on the event loop.
+
+    At most ``max_workers`` jobs run at once and at most ``max_queue`` more may wait
+    for a worker; anything beyond that is rejected with a 503 instead of piling up, unless
+    submitted with ``wait=True``, in which case it waits (first come, first served) for room.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int, queue_depth: Gauge | None = None) -> None:
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._queue_depth = queue_depth
+        self._executor: ThreadPoolExecutor | None = None
+        self._in_flight = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return max(0, self._in_flight - self.max_workers)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+        return self._executor
+
+    def _update_gauge(self) -> None:
+        if self._queue_depth is not None:
+            self._queue_depth.set(self.queued)
+
+    async def run[T](self, fn: Callable[..., T], *args: object, wait: bool = False) -> T:
+        while self._in_flight >= self.max_workers + self.max_queue:
+            if not wait:
+                raise AppError(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Server is busy, try again later"
+                )
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except BaseException:
+                if waiter.done() and not waiter.cancelled():
+                    # Woken for a free slot but cancelled before taking it: pass the slot on
+                    self._wake_waiter()
+                else:
+                    self._waiters.remove(waiter)
+                raise
+
+        self._in_flight += 1
+        self._update_gauge()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), functools.partial(fn, *args))
+        finally:
+            self._in_flight -= 1
+            self._update_gauge()
+            self._wake_waiter()
+
+    def _wake_waiter(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
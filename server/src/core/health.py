@@ -0,0 +1,121 @@
+import asyncio
+import contextlib
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any
+
+import structlog
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import QueuePool
+from src.core.config import settings
+from src.core.database import asyncpg_connect_args, postgres_engine
+from src.core.metrics import db_health_check_up
+
+logger = structlog.get_logger()
+
+
+@dataclass(frozen=True)
+class PoolUsage:
+    size: int
+    checked_out: int
+    overflow: int
+
+
+@dataclass(frozen=True)
+class DatabaseHealth:
+    healthy: bool
+    checked_at: datetime
+    latency_ms: float
+    pool: PoolUsage | None
+    error: str | None = None
+
+    @property
+    def age_seconds(self) -> float:
+        return (datetime.now(UTC) - self.checked_at).total_seconds()
+
+
+class DatabaseHealthMonitor:
+    """
+    Checks the database on an interval and keeps the latest result for ``/ready``.
+
+    Probes go through ``probe_engine``, which should not share the application pool, so that a
+    probe neither competes with requests for a connection nor waits behind them when the pool
+    is exhausted. Occupancy of ``pool_engine``'s pool is reported alongside.
+    """
+
+    def __init__(self, probe_engine: AsyncEngine, pool_engine: AsyncEngine) -> None:
+        self.probe_engine = probe_engine
+        self.pool_engine = pool_engine
+        self.last: DatabaseHealth | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    async def check(self) -> DatabaseHealth:
+        start = time.perf_counter()
+        error = None
+        try:
+            async with asyncio.timeout(settings.health_check_timeout_seconds):
+                async with self.probe_engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+        except Exception as e:
+            error = str(e) or type(e).__name__
+
+        self.last = DatabaseHealth(
+            healthy=error is None,
+            checked_at=datetime.now(UTC),
+            latency_ms=round((time.perf_counter() - start) * 1000, 2),
+            pool=self._pool_usage(),
+            error=error,
+        )
+        db_health_check_up.set(1 if self.last.healthy else 0)
+        if error is not None:
+            logger.warning("database_health_check_failed", error=error)
+        return self.last
+
+    def current(self) -> DatabaseHealth | None:
+        """The latest result, or None if there is none within ``health_check_max_staleness_seconds``"""
+        if self.last is None or self.last.age_seconds > settings.health_check_max_staleness_seconds:
+            return None
+        return self.last
+
+    def _pool_usage(self) -> PoolUsage | None:
+        pool = self.pool_engine.pool
+        if not isinstance(pool, QueuePool):
+            return None
+        return PoolUsage(size=pool.size(), checked_out=pool.checkedout(), overflow=max(pool.overflow(), 0))
+
+    async def _check_loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.check()
+
+    async def start(self, interval: float) -> None:
+        await self.check()
+        self._task = asyncio.create_task(self._check_loop(interval))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.probe_engine.dispose()
+
+
+def create_probe_engine(url: str, connect_args: dict[str, Any]) -> AsyncEngine:
+    """A single pooled connection for health probes, reused between checks rather than opened per check"""
+    return create_async_engine(
+        url,
+        connect_args=connect_args,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=settings.health_check_timeout_seconds,
+        pool_pre_ping=True,
+        pool_recycle=settings.db_pool_recycle,
+    )
+
+
+db_health_monitor = DatabaseHealthMonitor(
+    create_probe_engine(settings.postgres_url, asyncpg_connect_args()), pool_engine=postgres_engine
+)
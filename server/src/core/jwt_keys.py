@@ -0,0 +1,97 @@
+"""
+Keys that sign and verify access tokens.
+
+With an HS* ``jwt_algorithm`` (the default) tokens are signed with ``secret_key`` and only this
+service can verify them. With an asymmetric algorithm such as ES256, every key in
+``jwt_signing_keys`` has a ``kid``: new tokens are signed by the newest key whose ``active_from``
+has passed and carry its ``kid`` in their header, any listed key verifies the tokens it signed,
+and the public halves are served at ``/.well-known/jwks.json`` so that other services can verify
+tokens themselves.
+
+To rotate, add the next key with an ``active_from`` at least ``jwks_max_age_seconds`` ahead, so
+that every cached JWKS knows it before it signs anything. Remove the previous key once the tokens
+it signed have expired, ``jwt_expire_minutes`` after its successor became active.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from src.core.config import JwtSigningKey, settings
+
+if TYPE_CHECKING:
+    from jose.backends.base import Key
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    kid: str | None
+    # Parsed once; jose would otherwise parse the key material on every encode and decode
+    key: "Key"
+    # What verifies this key's signatures: the public half, or the key itself for HS*
+    verifier: "Key"
+    active_from: datetime | None = None
+
+
+class KeyRing:
+    def __init__(self, algorithm: str, keys: list[SigningKey]) -> None:
+        if not keys:
+            raise ValueError(f"No signing keys configured for {algorithm}, see jwt_signing_keys")
+        self.algorithm = algorithm
+        self.asymmetric = not algorithm.startswith("HS")
+        # Newest first, so the first key already active is the one to sign with
+        self.keys = sorted(keys, key=lambda k: k.active_from or datetime.min.replace(tzinfo=UTC), reverse=True)
+        self._by_kid = {key.kid: key for key in keys}
+
+        public_keys = [self._public_jwk(key) for key in self.keys] if self.asymmetric else []
+        self.jwks_json = json.dumps({"keys": public_keys}, separators=(",", ":")).encode()
+        # Identifies the verification keys, e.g. for caches of verified tokens
+        material = self.jwks_json if self.asymmetric else json.dumps(self.keys[0].key.to_dict()).encode()
+        self.fingerprint = hashlib.sha256(algorithm.encode() + b"\0" + material).digest()
+
+    def _public_jwk(self, key: SigningKey) -> dict[str, object]:
+        jwk: dict[str, object] = key.verifier.to_dict()
+        return {**jwk, "kid": key.kid, "alg": self.algorithm, "use": "sig"}
+
+    def signing_key(self, now: datetime | None = None) -> SigningKey:
+        now = now or datetime.now(UTC)
+        for key in self.keys:
+            if key.active_from is None or key.active_from <= now:
+                return key
+        raise RuntimeError("No JWT signing key is active yet, see jwt_signing_keys")
+
+    def verification_key(self, kid: str | None) -> "Key | None":
+        if not self.asymmetric:
+            return self.keys[0].verifier
+        key = self._by_kid.get(kid)
+        return key.verifier if key is not None else None
+
+
+def _load_signing_key(config: JwtSigningKey, algorithm: str) -> SigningKey:
+    from jose import jwk
+
+    key = jwk.construct(config.private_key_file.read_text(), algorithm)
+    if key.is_public():
+        raise ValueError(f"JWT signing key {config.kid!r} is a public key, expected a private key")
+    active_from = config.active_from
+    if active_from is not None and active_from.tzinfo is None:
+        active_from = active_from.replace(tzinfo=UTC)
+    return SigningKey(kid=config.kid, key=key, verifier=key.public_key(), active_from=active_from)
+
+
+@lru_cache(maxsize=4)
+def _build_key_ring(algorithm: str, secret_key: str, signing_keys: tuple[JwtSigningKey, ...]) -> KeyRing:
+    if algorithm.startswith("HS"):
+        from jose import jwk
+
+        key = jwk.construct(secret_key, algorithm)
+        return KeyRing(algorithm, [SigningKey(kid=None, key=key, verifier=key)])
+    return KeyRing(algorithm, [_load_signing_key(config, algorithm) for config in signing_keys])
+
+
+def key_ring() -> KeyRing:
+    """The key ring for the current settings, built (and key files read) once per configuration"""
+    return _build_key_ring(settings.jwt_algorithm, settings.secret_key, tuple(settings.jwt_signing_keys))
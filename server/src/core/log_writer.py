@@ -0,0 +1,141 @@
+import queue
+import sys
+import threading
+import time
+from typing import Literal, TextIO
+
+from src.core.config import settings
+from src.core.metrics import log_lines_dropped_total
+
+OverflowPolicy = Literal["drop", "block"]
+
+_STOP = object()
+
+
+class QueuedLogWriter:
+    """
+    Writes rendered log lines from a background thread so callers never block on stdout.
+
+    Lines are queued (up to ``max_queue_size``) and flushed in batches. When the queue is full,
+    ``overflow="drop"`` discards the line and counts it, while ``overflow="block"`` waits for room.
+    A batch whose write fails (e.g. a broken or non-blocking pipe) is counted as dropped as well,
+    and the thread carries on with the next one. Until ``start()`` is called, lines are written
+    synchronously.
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int,
+        overflow: OverflowPolicy,
+        stream: TextIO | None = None,
+        batch_size: int = 256,
+    ) -> None:
+        self.overflow = overflow
+        self.batch_size = batch_size
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+        self._stream = stream
+        self._queue: queue.Queue[object] = queue.Queue(maxsize=max_queue_size)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def stream(self) -> TextIO:
+        # Resolved on use so that redirected stdout (e.g. under pytest) is honoured
+        return self._stream or sys.stdout
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+            self._thread.start()
+
+    def write(self, line: str) -> None:
+        if self._thread is None:
+            self._write_batch([line])
+            return
+
+        if self.overflow == "block":
+            self._queue.put(line)
+            return
+
+        try:
+            self._queue.put_nowait(line)
+        except queue.Full:
+            self._count_dropped(1)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush everything queued so far and stop the writer thread, waiting at most ``timeout``"""
+        if self._thread is None:
+            return
+        deadline = time.monotonic() + timeout
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            # The thread is not draining (e.g. stuck on a blocked stream); it is a daemon, so leave it
+            pass
+        else:
+            self._thread.join(max(0.0, deadline - time.monotonic()))
+        self._thread = None
+
+    def _count_dropped(self, count: int) -> None:
+        with self._dropped_lock:
+            self.dropped += count
+        log_lines_dropped_total.inc(count)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch: list[str] = []
+            stop = item is _STOP
+            if not stop:
+                batch.append(str(item))
+            while not stop and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                else:
+                    batch.append(str(item))
+
+            if batch:
+                try:
+                    self._write_batch(batch)
+                except Exception:
+                    # Nowhere left to report it but the counter; the thread must outlive the failure
+                    self._count_dropped(len(batch))
+            if stop:
+                return
+
+    def _write_batch(self, lines: list[str]) -> None:
+        stream = self.stream
+        stream.write("\n".join(lines) + "\n")
+        stream.flush()
+
+
+class QueuedLogger:
+    """structlog logger that hands rendered lines to a ``QueuedLogWriter``"""
+
+    def __init__(self, writer: QueuedLogWriter) -> None:
+        self._writer = writer
+
+    def msg(self, message: str) -> None:
+        self._writer.write(message)
+
+    log = debug = info = warn = warning = msg
+    fatal = failure = err = error = critical = exception = msg
+
+
+class QueuedLoggerFactory:
+    def __init__(self, writer: QueuedLogWriter) -> None:
+        self._writer = writer
+
+    def __call__(self, *args: object) -> QueuedLogger:
+        return QueuedLogger(self._writer)
+
+
+log_writer = QueuedLogWriter(max_queue_size=settings.log_queue_max_size, overflow=settings.log_queue_overflow)
@@ -0,0 +1,91 @@
+import os
+
+from prometheus_client import Counter, Gauge, Histogram, multiprocess
+
+# Custom application metrics. They live in the default registry, which the
+# instrumentator exposes on /metrics alongside the HTTP metrics. With several
+# workers (PROMETHEUS_MULTIPROC_DIR set), every process writes its values to
+# that directory and /metrics aggregates them.
+
+
+def mark_worker_dead() -> None:
+    """Drop this worker's live gauge values from the multiprocess aggregate"""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(os.getpid())  # type: ignore[no-untyped-call]
+
+
+password_hash_queue_depth = Gauge(
+    "password_hash_queue_depth",
+    "Password hashing jobs waiting for a free worker",
+    multiprocess_mode="livesum",
+)
+password_hash_duration_seconds = Histogram(
+    "password_hash_duration_seconds",
+    "Time to hash or verify a password, including time spent queued",
+    ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+cache_hits_total = Counter("cache_hits_total", "In-process cache lookups that found a live entry", ["cache"])
+cache_misses_total = Counter("cache_misses_total", "In-process cache lookups that found no live entry", ["cache"])
+cache_evictions_total = Counter(
+    "cache_evictions_total",
+    "In-process cache entries dropped because they expired or the cache was full",
+    ["cache", "reason"],
+)
+
+log_lines_dropped_total = Counter(
+    "log_lines_dropped_total", "Log lines discarded because the log writer queue was full or writing them failed"
+)
+
+db_queries_per_request = Histogram(
+    "db_queries_per_request",
+    "Database statements executed while handling a request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+db_time_per_request_seconds = Histogram(
+    "db_time_per_request_seconds",
+    "Time spent executing database statements while handling a request",
+    ["route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+db_pool_checked_out = Gauge(
+    "db_pool_checked_out", "Connections currently checked out of the pool", ["pool"], multiprocess_mode="livesum"
+)
+db_pool_idle = Gauge("db_pool_idle", "Open connections idle in the pool", ["pool"], multiprocess_mode="livesum")
+db_pool_overflow = Gauge(
+    "db_pool_overflow", "Connections open beyond the pool size", ["pool"], multiprocess_mode="livesum"
+)
+db_pool_checkout_wait_seconds = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time to obtain a connection from the pool, including opening a new one",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+db_pool_connection_held_seconds = Histogram(
+    "db_pool_connection_held_seconds",
+    "Time a connection stays checked out of the pool, from checkout to return",
+    ["pool"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 30.0),
+)
+
+db_replica_fallbacks_total = Counter(
+    "db_replica_fallbacks_total", "Reads sent to the primary because no replica was reachable"
+)
+
+rate_limit_rejections_total = Counter(
+    "rate_limit_rejections_total", "Requests rejected with 429 by a rate limit", ["scope"]
+)
+
+db_health_check_up = Gauge(
+    "db_health_check_up", "1 if the last background database check succeeded", multiprocess_mode="livemin"
+)
+
+users_pruned_total = Counter("users_pruned_total", "Stale unverified users deleted by the pruning job")
+user_prune_batch_duration_seconds = Histogram(
+    "user_prune_batch_duration_seconds",
+    "Time to delete one batch of stale unverified users",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
@@ -1,36 +1,152 @@
+import asyncio
 import time
-from collections.abc import Awaitable, Callable
 from uuid import uuid4
 
 import structlog
-from fastapi import FastAPI, Request, Response
+from fastapi import FastAPI
 from src.core.config import settings
+from src.core.database import track_queries
+from src.core.metrics import db_queries_per_request, db_time_per_request_seconds
+from starlette.datastructures import MutableHeaders
 from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 logger = structlog.get_logger()
 
 
-async def request_id_middleware(request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
-    request_id = request.headers.get("x-request-id", str(uuid4()))
-    structlog.contextvars.clear_contextvars()
-    structlog.contextvars.bind_contextvars(request_id=request_id)
-    response = await call_next(request)
-    response.headers["x-request-id"] = request_id
-    return response
-
-
-async def logging_middleware(request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
-    start = time.perf_counter()
-    response = await call_next(request)
-    elapsed = time.perf_counter() - start
-    logger.info(
-        "request",
-        method=request.method,
-        path=request.url.path,
-        status=response.status_code,
-        duration=round(elapsed, 4),
-    )
-    return response
+class RequestIDMiddleware:
+    """Binds the request ID to the structlog context and echoes it back in ``x-request-id``"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _get_header(scope, b"x-request-id")
+        if request_id is None:
+            request_id = str(uuid4())
+        structlog.contextvars.clear_contextvars()
+        structlog.contextvars.bind_contextvars(request_id=request_id)
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["x-request-id"] = request_id
+            await send(message)
+
+        await self.app(scope, receive, send_with_request_id)
+
+
+class LoggingMiddleware:
+    """
+    Emits one access log line per request once the response has been sent, including the number
+    of database statements it ran, their total time and the slowest one.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        with track_queries() as queries:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                elapsed = time.perf_counter() - start
+                route = _route_template(scope)
+                db_queries_per_request.labels(route).observe(queries.count)
+                db_time_per_request_seconds.labels(route).observe(queries.total_seconds)
+                logger.info(
+                    "request",
+                    method=scope["method"],
+                    path=scope["path"],
+                    status=status_code,
+                    duration=round(elapsed, 4),
+                    db_queries=queries.count,
+                    db_time=round(queries.total_seconds, 4),
+                    db_slowest=round(queries.slowest_seconds, 4),
+                )
+
+
+class RequestDrain:
+    """
+    Counts the requests in progress and, once ``drain()`` is called, turns new ones away with 503.
+
+    The server normally stops accepting connections and waits for open ones before the lifespan
+    shutdown runs (uvicorn's ``timeout_graceful_shutdown``); this also covers requests that still
+    arrive on a kept-alive connection, or a server that does not wait.
+    """
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.draining = False
+
+    async def drain(self, timeout: float, poll_interval: float = 0.05) -> int:
+        """Stop accepting requests and wait up to ``timeout`` for those in progress; returns how many remain"""
+        self.draining = True
+        deadline = time.monotonic() + timeout
+        while self.in_flight and time.monotonic() < deadline:
+            await asyncio.sleep(poll_interval)
+        return self.in_flight
+
+    def reset(self) -> None:
+        self.draining = False
+
+
+request_drain = RequestDrain()
+
+
+class DrainMiddleware:
+    """Tracks requests in ``request_drain``, rejecting them with 503 while the worker shuts down"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if request_drain.draining:
+            response = JSONResponse(
+                {"detail": "Server is shutting down"}, status_code=503, headers={"Connection": "close"}
+            )
+            await response(scope, receive, send)
+            return
+
+        request_drain.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_drain.in_flight -= 1
+
+
+def _get_header(scope: Scope, name: bytes) -> str | None:
+    for key, value in scope["headers"]:
+        if key == name:
+            return str(value.decode("latin-1"))
+    return None
+
+
+def _route_template(scope: Scope) -> str:
+    # The router stores the matched route in the scope; unmatched paths share one label
+    route = scope.get("route")
+    return str(getattr(route, "path", "unmatched"))
 
 
 def register_middleware(app: FastAPI) -> None:
@@ -41,5 +157,6 @@ def register_middleware(app: FastAPI) -> None:
         allow_methods=["*"],
         allow_headers=["*"],
     )
-    app.middleware("http")(logging_middleware)
-    app.middleware("http")(request_id_middleware)
+    app.add_middleware(DrainMiddleware)
+    app.add_middleware(LoggingMiddleware)
+    app.add_middleware(RequestIDMiddleware)
@@ -0,0 +1,64 @@
+import asyncio
+import contextlib
+import time
+from datetime import UTC, datetime, timedelta
+
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from src.core.config import settings
+from src.core.metrics import user_prune_batch_duration_seconds, users_pruned_total
+from src.repositories.users import UserRepository
+
+logger = structlog.get_logger()
+
+
+class StaleUserPruner:
+    """
+    Periodically deletes unverified users older than ``prune_unverified_after_days``.
+
+    Each run deletes in batches of ``prune_batch_size``, one short transaction per batch with a
+    pause in between, so locks are held briefly and regular traffic is never starved.
+    """
+
+    def __init__(self) -> None:
+        self._task: asyncio.Task[None] | None = None
+
+    async def prune(self, session_factory: async_sessionmaker[AsyncSession]) -> int:
+        """Delete every stale unverified user, batch by batch; returns the number deleted"""
+        cutoff = datetime.now(UTC) - timedelta(days=settings.prune_unverified_after_days)
+        total = 0
+        while True:
+            start = time.perf_counter()
+            async with session_factory() as session:
+                deleted = await UserRepository(session).delete_stale_unverified_users(cutoff, settings.prune_batch_size)
+            user_prune_batch_duration_seconds.observe(time.perf_counter() - start)
+            users_pruned_total.inc(deleted)
+            total += deleted
+            if deleted < settings.prune_batch_size:
+                break
+            await asyncio.sleep(settings.prune_batch_pause_seconds)
+
+        if total:
+            logger.info("stale_users_pruned", deleted=total, created_before=cutoff.isoformat())
+        return total
+
+    async def _prune_loop(self, session_factory: async_sessionmaker[AsyncSession], interval: float) -> None:
+        while True:
+            try:
+                await self.prune(session_factory)
+            except Exception as e:
+                logger.error("stale_user_pruning_failed", error=str(e))
+            await asyncio.sleep(interval)
+
+    def start(self, session_factory: async_sessionmaker[AsyncSession], interval: float) -> None:
+        self._task = asyncio.create_task(self._prune_loop(session_factory, interval))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+stale_user_pruner = StaleUserPruner()
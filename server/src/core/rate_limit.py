@@ -0,0 +1,150 @@
+import math
+import re
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Literal
+from uuid import UUID
+
+from fastapi import Depends, Request, status
+from src.core.auth import get_current_user_id
+from src.core.config import settings
+from src.core.exceptions import AppError
+from src.core.metrics import rate_limit_rejections_total
+
+_PERIODS = {"second": 1.0, "minute": 60.0, "hour": 3600.0, "day": 86400.0}
+_RATE = re.compile(r"^\s*(\d+)\s*/\s*(second|minute|hour|day)\s*$")
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Token bucket holding up to ``capacity`` requests, refilled evenly over ``period_seconds``"""
+
+    capacity: int
+    period_seconds: float
+
+    @classmethod
+    def parse(cls, value: str) -> "RateLimit":
+        """Parse ``"<count>/<second|minute|hour|day>"``, e.g. ``"10/minute"``"""
+        match = _RATE.match(value)
+        if match is None:
+            raise ValueError(f"Invalid rate limit {value!r}, expected e.g. '10/minute'")
+        return cls(capacity=int(match[1]), period_seconds=_PERIODS[match[2]])
+
+    @property
+    def refill_per_second(self) -> float:
+        return self.capacity / self.period_seconds
+
+
+class RateLimitBackendInterface(ABC):
+    @abstractmethod
+    async def hit(self, key: str, limit: RateLimit) -> float:
+        """Take one request from ``key``'s bucket; return 0 if allowed, else seconds until it would be"""
+
+    @abstractmethod
+    async def reset(self) -> None:
+        pass
+
+
+class MemoryRateLimitBackend(RateLimitBackendInterface):
+    """
+    Per-process token buckets.
+
+    Each key costs one ``(tokens, updated_at, full_at)`` tuple. Buckets are kept in update order, so
+    the ones that have refilled completely (and are therefore equivalent to no entry) are dropped
+    from the front as new hits come in; ``max_keys`` bounds memory if that is not enough.
+    """
+
+    def __init__(self, max_keys: int) -> None:
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float, float]] = OrderedDict()
+
+    async def hit(self, key: str, limit: RateLimit) -> float:
+        now = time.monotonic()
+        self._expire(now)
+
+        bucket = self._buckets.pop(key, None)
+        if bucket is None:
+            tokens = float(limit.capacity)
+        else:
+            tokens, updated_at, _ = bucket
+            tokens = min(limit.capacity, tokens + (now - updated_at) * limit.refill_per_second)
+
+        retry_after = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / limit.refill_per_second
+
+        full_at = now + (limit.capacity - tokens) / limit.refill_per_second
+        self._buckets[key] = (tokens, now, full_at)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+    async def reset(self) -> None:
+        self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _expire(self, now: float) -> None:
+        # Oldest first; stop at the first bucket that is still refilling. Buckets of longer limits
+        # can shadow shorter ones behind them, which only delays their removal.
+        while self._buckets:
+            _, (_, _, full_at) = next(iter(self._buckets.items()))
+            if full_at > now:
+                return
+            self._buckets.popitem(last=False)
+
+
+@lru_cache(maxsize=64)
+def _parse_limit(value: str) -> RateLimit:
+    return RateLimit.parse(value)
+
+
+rate_limit_backend: RateLimitBackendInterface = MemoryRateLimitBackend(max_keys=settings.rate_limit_max_keys)
+
+
+async def enforce_rate_limit(scope: str, key: str, limit: str) -> None:
+    """Raise 429 if ``key`` has exhausted ``limit`` (a ``RateLimit.parse`` string) within ``scope``"""
+    if not settings.rate_limit_enabled:
+        return
+    retry_after = await rate_limit_backend.hit(f"{scope}:{key}", _parse_limit(limit))
+    if retry_after > 0:
+        rate_limit_rejections_total.labels(scope).inc()
+        raise AppError(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+
+def client_ip(request: Request) -> str:
+    # Behind the proxy this is the forwarded address, see ``forwarded_allow_ips``
+    return request.client.host if request.client else "unknown"
+
+
+def rate_limit(
+    scope: str, limit: Callable[[], str], by: Literal["ip", "user"] = "ip"
+) -> Callable[..., Awaitable[None]]:
+    """
+    Dependency limiting a route per client IP or per authenticated user.
+
+    ``limit`` is read on every request (e.g. ``lambda: settings.rate_limit_login``) so that settings
+    changes, including in tests, take effect without rebuilding the route.
+    """
+    if by == "user":
+
+        async def limit_by_user(user_id: UUID = Depends(get_current_user_id)) -> None:
+            await enforce_rate_limit(scope, str(user_id), limit())
+
+        return limit_by_user
+
+    async def limit_by_ip(request: Request) -> None:
+        await enforce_rate_limit(scope, client_ip(request), limit())
+
+    return limit_by_ip
@@ -0,0 +1,21 @@
+from typing import Any
+
+from pydantic import BaseModel
+from starlette.responses import Response
+
+
+class ModelResponse(Response):
+    """
+    JSON response rendered straight from a pydantic model by its compiled serializer.
+
+    Returning one from a handler bypasses FastAPI's response handling, which would validate the
+    already-validated model a second time before serializing it. Keep ``response_model`` on the
+    route so the OpenAPI schema still documents the body.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if not isinstance(content, BaseModel):
+            raise TypeError(f"ModelResponse needs a pydantic model, got {type(content).__name__}")
+        return content.__pydantic_serializer__.to_json(content)
@@ -0,0 +1,91 @@
+import asyncio
+import contextlib
+import math
+from datetime import UTC, datetime, timedelta
+from uuid import UUID
+
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from src.core.config import settings
+from src.repositories.revoked_tokens import RevokedTokenRepository
+
+logger = structlog.get_logger()
+
+
+def revoked_before_seconds(revoked_before: datetime) -> int:
+    """
+    A revocation cutoff at the granularity of ``iat``, which is whole seconds: tokens issued in the
+    same second as the revocation, such as the one issued right after it, stay valid.
+    """
+    return math.floor(revoked_before.timestamp())
+
+
+class TokenRevocationList:
+    """
+    In-memory copy of ``revoked_tokens`` used by stateless auth mode.
+
+    Revocations made by this process apply immediately; those made elsewhere (other workers,
+    scripts) apply after the next refresh, so the staleness window is the refresh interval.
+    """
+
+    def __init__(self) -> None:
+        self._revoked_before: dict[UUID, int] = {}
+        self._task: asyncio.Task[None] | None = None
+        self.last_refresh: datetime | None = None
+
+    def __len__(self) -> int:
+        return len(self._revoked_before)
+
+    def add(self, user_id: UUID, revoked_before: datetime) -> None:
+        cutoff = revoked_before_seconds(revoked_before)
+        self._revoked_before[user_id] = max(cutoff, self._revoked_before.get(user_id, cutoff))
+
+    def is_revoked(self, user_id: UUID, issued_at: int) -> bool:
+        cutoff = self._revoked_before.get(user_id)
+        return cutoff is not None and issued_at < cutoff
+
+    def clear(self) -> None:
+        self._revoked_before.clear()
+        self.last_refresh = None
+
+    async def refresh(self, session: AsyncSession) -> None:
+        # Tokens older than the expiry window are rejected anyway, so older revocations can go
+        horizon = datetime.now(UTC) - timedelta(minutes=settings.jwt_expire_minutes)
+        repo = RevokedTokenRepository(session)
+        await repo.prune(horizon)
+        revocations = await repo.get_revocations(horizon)
+
+        merged = {user_id: revoked_before_seconds(revoked_before) for user_id, revoked_before in revocations.items()}
+        for user_id, cutoff in self._revoked_before.items():
+            if cutoff > horizon.timestamp():
+                merged[user_id] = max(cutoff, merged.get(user_id, cutoff))
+        self._revoked_before = merged
+        self.last_refresh = datetime.now(UTC)
+
+    async def _refresh_loop(self, session_factory: async_sessionmaker[AsyncSession], interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with session_factory() as session:
+                    await self.refresh(session)
+            except Exception as e:
+                logger.error("token_revocation_refresh_failed", error=str(e))
+
+    async def start(self, session_factory: async_sessionmaker[AsyncSession], interval: float) -> None:
+        try:
+            async with session_factory() as session:
+                await self.refresh(session)
+        except Exception as e:
+            # As with an unreachable database elsewhere, start anyway; the refresh loop retries
+            logger.error("token_revocation_refresh_failed", error=str(e) or type(e).__name__)
+        self._task = asyncio.create_task(self._refresh_loop(session_factory, interval))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+token_revocation_list = TokenRevocationList()
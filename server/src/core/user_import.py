@@ -0,0 +1,136 @@
+import asyncio
+import codecs
+import csv
+import json
+from collections.abc import AsyncIterable, AsyncIterator
+from typing import Literal
+
+import structlog
+from pydantic import ValidationError
+from src.core.auth import aget_password_hash, password_hasher
+from src.core.config import settings
+from src.repositories.users import UserRepositoryInterface
+from src.schemas.users import BulkImportResponse, BulkImportRowError, CreateUserRequest
+
+logger = structlog.get_logger()
+
+ImportFormat = Literal["jsonl", "csv"]
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """Split a stream of UTF-8 byte chunks into lines without buffering the whole stream"""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def _parse_rows(
+    lines: AsyncIterable[str], input_format: ImportFormat, result: BulkImportResponse
+) -> AsyncIterator[tuple[int, CreateUserRequest]]:
+    """Yield (line number, validated row); malformed rows are recorded on ``result`` and skipped"""
+    header: list[str] | None = None
+    line_number = 0
+    async for raw_line in lines:
+        line_number += 1
+        line = raw_line.strip()
+        if not line:
+            continue
+
+        data: object
+        if input_format == "csv":
+            fields = next(csv.reader([line]))
+            if header is None:
+                header = [field.strip().lower() for field in fields]
+                continue
+            data = dict(zip(header, fields, strict=False))
+        else:
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError:
+                _record_error(result, line_number, None, "Invalid JSON")
+                result.invalid += 1
+                continue
+
+        try:
+            row = CreateUserRequest.model_validate(data)
+        except ValidationError as e:
+            email = data.get("email") if isinstance(data, dict) else None
+            _record_error(result, line_number, str(email) if email else None, e.errors()[0]["msg"])
+            result.invalid += 1
+            continue
+
+        yield line_number, row
+
+
+def _record_error(result: BulkImportResponse, line: int, email: str | None, reason: str) -> None:
+    if len(result.errors) < settings.bulk_import_max_reported_errors:
+        result.errors.append(BulkImportRowError(line=line, email=email, reason=reason))
+    else:
+        result.errors_truncated = True
+
+
+async def _import_batch(
+    batch: list[tuple[int, CreateUserRequest]], user_repo: UserRepositoryInterface, result: BulkImportResponse
+) -> None:
+    # Skip hashing rows that would only conflict; re-running a partially applied import is then cheap
+    existing = await user_repo.find_existing_emails([row.email for _, row in batch])
+    await user_repo.release()
+    new_rows = []
+    for line, row in batch:
+        if row.email in existing:
+            result.conflicts += 1
+            _record_error(result, line, row.email, "Email already registered")
+        else:
+            new_rows.append((line, row))
+
+    # Never queue more hashes than there are workers, so the import does not starve other requests.
+    # When other requests fill the queue, wait rather than fail with earlier batches already committed
+    semaphore = asyncio.Semaphore(password_hasher.max_workers)
+
+    async def hash_password(password: str) -> str:
+        async with semaphore:
+            return await aget_password_hash(password, wait=True)
+
+    hashes = await asyncio.gather(*(hash_password(row.password) for _, row in new_rows))
+    created = await user_repo.bulk_create_registered_users(
+        [(row.email, password_hash) for (_, row), password_hash in zip(new_rows, hashes, strict=True)]
+    )
+    for (line, row), was_created in zip(new_rows, created, strict=True):
+        if was_created:
+            result.created += 1
+        else:
+            result.conflicts += 1
+            _record_error(result, line, row.email, "Email already registered")
+
+
+async def import_users(
+    lines: AsyncIterable[str], input_format: ImportFormat, user_repo: UserRepositoryInterface
+) -> BulkImportResponse:
+    """
+    Create registered users from JSONL (``{"email": ..., "password": ...}`` per line) or CSV
+    (``email,password`` header) input.
+
+    Input is consumed as a stream and written in batches of ``bulk_import_batch_size``, each
+    committed on its own, so memory stays bounded by the batch size whatever the input size.
+    Invalid and conflicting rows are reported (up to ``bulk_import_max_reported_errors``)
+    without aborting the import.
+    """
+    result = BulkImportResponse()
+    batch: list[tuple[int, CreateUserRequest]] = []
+    async for line, row in _parse_rows(lines, input_format, result):
+        batch.append((line, row))
+        if len(batch) >= settings.bulk_import_batch_size:
+            await _import_batch(batch, user_repo, result)
+            batch = []
+    if batch:
+        await _import_batch(batch, user_repo, result)
+
+    logger.info("bulk_import_finished", created=result.created, conflicts=result.conflicts, invalid=result.invalid)
+    return result
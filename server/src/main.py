@@ -1,13 +1,27 @@
+import gc
+import json
 import logging
+import time
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any
 
 import structlog
 from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.api.router import router
+from src.core.auth import password_hasher
 from src.core.config import settings
+from src.core.database import AsyncSessionLocal, postgres_engine, replica_router, warm_up_pool
 from src.core.exceptions import register_exception_handlers
-from src.core.middleware import register_middleware
+from src.core.health import db_health_monitor
+from src.core.log_writer import QueuedLoggerFactory, log_writer
+from src.core.metrics import mark_worker_dead
+from src.core.middleware import register_middleware, request_drain
+from src.core.pruning import stale_user_pruner
+from src.core.revocation import token_revocation_list
+from src.repositories.users import UserRepository
 
 
 def configure_logging() -> None:
@@ -22,25 +36,71 @@ def configure_logging() -> None:
         ],
         wrapper_class=structlog.make_filtering_bound_logger(log_level),
         context_class=dict,
-        logger_factory=structlog.PrintLoggerFactory(),
+        logger_factory=QueuedLoggerFactory(log_writer),
         cache_logger_on_first_use=True,
     )
 
 
+async def _prime_statements(session: AsyncSession) -> None:
+    await UserRepository(session).prime_statements()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     configure_logging()
+    log_writer.start()
     logger = structlog.get_logger()
     logger.info("startup", app_name=settings.app_name)
+    request_drain.reset()
+    # The server reports ready (and takes traffic) only once this returns
+    if settings.db_pool_warm_up_connections > 0:
+        start = time.perf_counter()
+        opened = await warm_up_pool(
+            AsyncSessionLocal,
+            settings.db_pool_warm_up_connections,
+            _prime_statements if settings.db_pool_warm_up_prime_statements else None,
+        )
+        logger.info("db_pool_warmed_up", connections=opened, duration=round(time.perf_counter() - start, 4))
+    await db_health_monitor.start(settings.health_check_interval_seconds)
+    if settings.auth_stateless:
+        await token_revocation_list.start(AsyncSessionLocal, settings.auth_revocation_refresh_seconds)
+    if settings.prune_unverified_after_days > 0:
+        stale_user_pruner.start(AsyncSessionLocal, settings.prune_interval_seconds)
+    # Everything allocated so far lives as long as the worker; keep it out of future GC passes
+    gc.collect()
+    gc.freeze()
     yield
-    logger.info("shutdown", app_name=settings.app_name)
+    start = time.perf_counter()
+    abandoned = await request_drain.drain(settings.shutdown_drain_timeout_seconds)
+    drained = time.perf_counter()
+    await token_revocation_list.stop()
+    await stale_user_pruner.stop()
+    await db_health_monitor.stop()
+    password_hasher.shutdown()
+    # Nothing uses the database past this point; close its connections rather than drop them
+    await postgres_engine.dispose()
+    await replica_router.dispose()
+    mark_worker_dead()
+    logger.info(
+        "shutdown",
+        app_name=settings.app_name,
+        drain_duration=round(drained - start, 4),
+        requests_abandoned=abandoned,
+        shutdown_duration=round(time.perf_counter() - start, 4),
+        log_lines_dropped=log_writer.dropped,
+    )
+    log_writer.close()
 
 
 def create_app() -> FastAPI:
+    docs = settings.docs_enabled
     application = FastAPI(
         title=settings.app_name,
         debug=settings.is_debug,
         lifespan=lifespan,
+        openapi_url="/openapi.json" if docs else None,
+        docs_url="/docs" if docs else None,
+        redoc_url="/redoc" if docs else None,
     )
 
     register_middleware(application)
@@ -54,6 +114,12 @@ def create_app() -> FastAPI:
             excluded_handlers=["/health", "/ready", "/metrics"],
         ).instrument(application).expose(application, endpoint="/metrics")
 
+    if docs and settings.openapi_schema_path:
+        # Serve the artifact from scripts/export_openapi.py instead of generating the schema on first hit
+        schema: dict[str, Any] = json.loads(Path(settings.openapi_schema_path).read_text())
+        # Replaces the generator rather than seeding openapi_schema, which FastAPI may rebuild
+        application.openapi = lambda: schema  # type: ignore[method-assign]
+
     return application
 
 
@@ -62,4 +128,4 @@ app = create_app()
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(app, host=settings.server_host, port=settings.server_port)
@@ -1,3 +1,4 @@
+from .revoked_tokens import RevokedTokenModel
 from .users import UserModel
 
-__all__ = ["UserModel"]
+__all__ = ["RevokedTokenModel", "UserModel"]
@@ -0,0 +1,14 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from src.core.database import Base
+
+
+class RevokedTokenModel(Base):
+    __tablename__ = "revoked_tokens"
+
+    # Tokens issued to user_id before revoked_before are rejected in stateless auth mode
+    user_id: Mapped[uuid.UUID] = mapped_column(primary_key=True)
+    revoked_before: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
@@ -1,16 +1,28 @@
 import uuid
 from datetime import UTC, datetime
 
-from sqlalchemy import String
+from sqlalchemy import Index, String, text
 from sqlalchemy.orm import Mapped, mapped_column
 from src.core.database import Base
 
 
 class UserModel(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_created_at_id", "created_at", "id"),
+        # Emails are unique case-insensitively; lookups compare lower(email) to use this index
+        Index("ix_users_email_lower", text("lower(email)"), unique=True),
+        # Small index over never-registered users only, used by the pruning job
+        Index(
+            "ix_users_unverified_created_at",
+            "created_at",
+            postgresql_where=text("is_verified = false"),
+            sqlite_where=text("is_verified = 0"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
-    email: Mapped[str | None] = mapped_column(String, unique=True, default=None)
+    email: Mapped[str | None] = mapped_column(String, default=None)
     password_hash: Mapped[str | None] = mapped_column(String, default=None)
     is_verified: Mapped[bool] = mapped_column(default=False)
     is_superuser: Mapped[bool] = mapped_column(default=False)
@@ -0,0 +1,71 @@
+from abc import ABC, abstractmethod
+from datetime import UTC, datetime
+from typing import Any, cast
+from uuid import UUID
+
+from sqlalchemy import CursorResult, delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.models.postgres.revoked_tokens import RevokedTokenModel
+
+
+class RevokedTokenRepositoryInterface(ABC):
+    @abstractmethod
+    async def revoke(self, user_id: UUID, revoked_before: datetime) -> None:
+        pass
+
+    @abstractmethod
+    async def get_revoked_before(self, user_id: UUID) -> datetime | None:
+        pass
+
+    @abstractmethod
+    async def get_revocations(self, since: datetime) -> dict[UUID, datetime]:
+        pass
+
+    @abstractmethod
+    async def prune(self, before: datetime) -> int:
+        pass
+
+
+class RevokedTokenRepository(RevokedTokenRepositoryInterface):
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def revoke(self, user_id: UUID, revoked_before: datetime) -> None:
+        """Upsert a revocation in the current transaction; the caller commits"""
+        # Token iat values are whole seconds; a cutoff within a second would reject the next token issued
+        revoked_before = revoked_before.replace(microsecond=0)
+        insert = postgresql.insert if self.session.get_bind().dialect.name == "postgresql" else sqlite.insert
+        stmt = insert(RevokedTokenModel).values(user_id=user_id, revoked_before=revoked_before)
+        await self.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[RevokedTokenModel.user_id], set_={"revoked_before": stmt.excluded.revoked_before}
+            )
+        )
+
+    async def get_revoked_before(self, user_id: UUID) -> datetime | None:
+        revoked_before = await self.session.scalar(
+            select(RevokedTokenModel.revoked_before).where(RevokedTokenModel.user_id == user_id)
+        )
+        return _as_utc(revoked_before) if revoked_before is not None else None
+
+    async def get_revocations(self, since: datetime) -> dict[UUID, datetime]:
+        result = await self.session.execute(
+            select(RevokedTokenModel.user_id, RevokedTokenModel.revoked_before).where(
+                RevokedTokenModel.revoked_before > since
+            )
+        )
+        return {user_id: _as_utc(revoked_before) for user_id, revoked_before in result.all()}
+
+    async def prune(self, before: datetime) -> int:
+        result = cast(
+            "CursorResult[Any]",
+            await self.session.execute(delete(RevokedTokenModel).where(RevokedTokenModel.revoked_before <= before)),
+        )
+        await self.session.commit()
+        return result.rowcount
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite drops the timezone on the way back
+    return value if value.tzinfo is not None else value.replace(tzinfo=UTC)
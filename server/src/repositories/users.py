@@ -1,16 +1,51 @@
+import uuid
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Sequence
+from datetime import UTC, datetime, timedelta
+from typing import NoReturn
 from uuid import UUID
 
 import structlog
+from sqlalchemy import ColumnElement, bindparam, delete, false, func, insert, literal, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from src.core.cache import principal_cache
+from src.core.config import settings
 from src.core.exceptions import ConflictError, ForbiddenError, NotFoundError
+from src.core.revocation import token_revocation_list
 from src.models.postgres.users import UserModel
+from src.repositories.revoked_tokens import RevokedTokenRepository
 
 logger = structlog.get_logger()
 
 
+def _dialect_insert(session: AsyncSession) -> type[postgresql.Insert] | type[sqlite.Insert]:
+    """The dialect's INSERT construct, which unlike the generic one supports ON CONFLICT"""
+    return postgresql.Insert if session.get_bind().dialect.name == "postgresql" else sqlite.Insert
+
+
+# Built once rather than per call: constructing a select and generating its cache key (which the
+# statement memoizes) are the Python-side costs left once SQLAlchemy has cached the compiled SQL
+_select_user_by_id = select(UserModel).where(UserModel.id == bindparam("user_id"))
+_select_user_by_email = select(UserModel).where(func.lower(UserModel.email) == bindparam("email"))
+
+
+def _email_matches(email: str) -> ColumnElement[bool]:
+    # Written as in the ix_users_email_lower index expression so that lookups can use it
+    return func.lower(UserModel.email) == email.lower()
+
+
+def _identifier_predicate(user_identifier: UUID | str) -> ColumnElement[bool]:
+    if isinstance(user_identifier, UUID):
+        return UserModel.id == user_identifier
+    try:
+        return UserModel.id == UUID(str(user_identifier))
+    except ValueError:
+        return _email_matches(str(user_identifier))
+
+
 class UserRepositoryInterface(ABC):
     @abstractmethod
     async def create_user(self) -> UserModel:
@@ -25,91 +60,265 @@ class UserRepositoryInterface(ABC):
         pass
 
     @abstractmethod
-    async def register_user(self, user_id: UUID, email: str, password_hash: str) -> UserModel:
+    async def list_users(self, limit: int, after: tuple[datetime, UUID] | None = None) -> list[UserModel]:
+        pass
+
+    @abstractmethod
+    def stream_users(self, batch_size: int) -> AsyncIterator[Sequence[UserModel]]:
+        pass
+
+    @abstractmethod
+    async def register_user(
+        self, user_id: UUID, email: str, password_hash: str, create_missing: bool = False
+    ) -> UserModel:
         pass
 
     @abstractmethod
     async def create_registered_user(self, email: str, password_hash: str) -> UserModel:
         pass
 
+    @abstractmethod
+    async def replace_password_hash(self, user_id: UUID, old_hash: str, new_hash: str) -> bool:
+        pass
+
+    @abstractmethod
+    async def find_existing_emails(self, emails: Sequence[str]) -> set[str]:
+        pass
+
+    @abstractmethod
+    async def bulk_create_registered_users(self, users: Sequence[tuple[str, str]]) -> list[bool]:
+        pass
+
     @abstractmethod
     async def delete_user(self, user_identifier: UUID | str, deleting_user_id: UUID) -> UserModel:
         pass
 
+    @abstractmethod
+    async def release(self) -> None:
+        """End the current transaction and return its connection to the pool; the next call starts a new one"""
+
+    @abstractmethod
+    async def prime_statements(self) -> None:
+        """Run the hot lookups once, so that this connection has them prepared before real traffic"""
+
+    @abstractmethod
+    async def delete_stale_unverified_users(self, created_before: datetime, limit: int) -> int:
+        pass
+
 
 class UserRepository(UserRepositoryInterface):
     def __init__(self, session: AsyncSession):
         self.session = session
 
     async def create_user(self) -> UserModel:
-        db_user = UserModel()
-        self.session.add(db_user)
+        # Column defaults are applied client side, so the row comes back without a refresh
+        result = await self.session.scalars(insert(UserModel).returning(UserModel))
+        db_user = result.one()
         await self.session.commit()
-        await self.session.refresh(db_user)
         return db_user
 
     async def get_user(self, user_id: UUID) -> UserModel | None:
-        result = await self.session.execute(select(UserModel).where(UserModel.id == user_id))
+        result = await self.session.execute(_select_user_by_id, {"user_id": user_id})
         return result.scalar_one_or_none()
 
     async def get_user_by_email(self, email: str) -> UserModel | None:
-        result = await self.session.execute(select(UserModel).where(UserModel.email == email))
+        result = await self.session.execute(_select_user_by_email, {"email": email.lower()})
         return result.scalar_one_or_none()
 
-    async def register_user(self, user_id: UUID, email: str, password_hash: str) -> UserModel:
-        result = await self.session.execute(select(UserModel).where(UserModel.id == user_id))
-        user = result.scalar_one_or_none()
-
-        if not user:
-            raise NotFoundError("User not found")
+    async def list_users(self, limit: int, after: tuple[datetime, UUID] | None = None) -> list[UserModel]:
+        """Return up to ``limit`` users ordered by (created_at, id), starting after the given keyset position"""
+        stmt = select(UserModel).order_by(UserModel.created_at, UserModel.id).limit(limit)
+        if after is not None:
+            created_at, user_id = after
+            stmt = stmt.where(
+                tuple_(UserModel.created_at, UserModel.id)
+                > tuple_(literal(created_at, UserModel.created_at.type), literal(user_id, UserModel.id.type))
+            )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
 
-        user.email = email
-        user.password_hash = password_hash
-        user.is_verified = True
+    async def stream_users(self, batch_size: int) -> AsyncIterator[Sequence[UserModel]]:
+        """Yield every user in (created_at, id) order from a server-side cursor, ``batch_size`` rows at a time"""
+        stmt = select(UserModel).order_by(UserModel.created_at, UserModel.id).execution_options(yield_per=batch_size)
+        result = await self.session.stream_scalars(stmt)
+        # The identity map only holds weak references, so rows from earlier batches are freed once sent
+        async for partition in result.partitions():
+            yield partition
 
+    async def register_user(
+        self, user_id: UUID, email: str, password_hash: str, create_missing: bool = False
+    ) -> UserModel:
+        """
+        Register ``user_id``. Without a row, the user is inserted only with ``create_missing`` (a lazy
+        anonymous user, see ``anonymous_users_lazy``) and if it was never deleted.
+        """
+        values = {"email": email.lower(), "password_hash": password_hash, "is_verified": True}
         try:
+            result = await self.session.scalars(
+                update(UserModel)
+                .where(UserModel.id == user_id)
+                .values(**values)
+                .returning(UserModel)
+                .execution_options(populate_existing=True)
+            )
+            user = result.one_or_none()
+            if user is None:
+                # Deleting a user records a revocation that outlives all of its tokens
+                if not create_missing or await RevokedTokenRepository(self.session).get_revoked_before(user_id):
+                    raise NotFoundError("User not found")
+                user = await self._insert_unless_conflict(id=user_id, **values)
             await self.session.commit()
         except IntegrityError as e:
             await self.session.rollback()
             raise ConflictError("Email already registered") from e
 
-        await self.session.refresh(user)
+        principal_cache.invalidate(user_id)
         return user
 
     async def create_registered_user(self, email: str, password_hash: str) -> UserModel:
-        db_user = UserModel(email=email, password_hash=password_hash, is_verified=True, is_superuser=False)
-        self.session.add(db_user)
+        db_user = await self._insert_unless_conflict(
+            email=email.lower(), password_hash=password_hash, is_verified=True, is_superuser=False
+        )
+        await self.session.commit()
+        return db_user
 
-        try:
-            await self.session.commit()
-        except IntegrityError as e:
-            await self.session.rollback()
-            raise ConflictError("Email already registered") from e
+    async def replace_password_hash(self, user_id: UUID, old_hash: str, new_hash: str) -> bool:
+        """Swap the hash only if it is still ``old_hash``, so a concurrent password change wins"""
+        result = await self.session.execute(
+            update(UserModel)
+            .where(UserModel.id == user_id, UserModel.password_hash == old_hash)
+            .values(password_hash=new_hash)
+            .returning(UserModel.id)
+        )
+        replaced = result.first() is not None
+        await self.session.commit()
+        if replaced:
+            principal_cache.invalidate(user_id)
+        return replaced
 
-        await self.session.refresh(db_user)
-        return db_user
+    async def _insert_unless_conflict(self, **values: object) -> UserModel:
+        """INSERT ... ON CONFLICT DO NOTHING RETURNING the row; ConflictError if it already existed"""
+        result = await self.session.scalars(
+            _dialect_insert(self.session)(UserModel).values(**values).on_conflict_do_nothing().returning(UserModel)
+        )
+        user = result.one_or_none()
+        if user is None:
+            raise ConflictError("Email already registered")
+        return user
 
-    async def delete_user(self, user_identifier: UUID | str, deleting_user_id: UUID) -> UserModel:
-        user = None
-        if isinstance(user_identifier, UUID):
-            user = await self.get_user(user_identifier)
-        else:
-            try:
-                uuid_identifier = UUID(str(user_identifier))
-                user = await self.get_user(uuid_identifier)
-            except ValueError:
-                user = await self.get_user_by_email(str(user_identifier))
-
-        if not user:
-            raise NotFoundError("User not found")
+    async def find_existing_emails(self, emails: Sequence[str]) -> set[str]:
+        if not emails:
+            return set()
+        # Stored emails are lowercase; the returned ones are too
+        result = await self.session.execute(
+            select(UserModel.email).where(func.lower(UserModel.email).in_({email.lower() for email in emails}))
+        )
+        return {email for email in result.scalars().all() if email is not None}
 
-        if user.id == deleting_user_id:
-            raise ForbiddenError("Cannot delete your own account")
+    async def bulk_create_registered_users(self, users: Sequence[tuple[str, str]]) -> list[bool]:
+        """
+        Insert (email, password_hash) pairs as registered users in a single multi-row statement.
+        Rows whose email already exists are skipped rather than failing the batch.
+        Returns, per input row, whether it was inserted.
+        """
+        if not users:
+            return []
+
+        now = datetime.now(UTC)
+        stmt = (
+            _dialect_insert(self.session)(UserModel)
+            .values(
+                [
+                    {
+                        "id": uuid.uuid4(),
+                        "email": email.lower(),
+                        "password_hash": password_hash,
+                        "is_verified": True,
+                        "is_superuser": False,
+                        "created_at": now,
+                    }
+                    for email, password_hash in users
+                ]
+            )
+            .on_conflict_do_nothing()
+            .returning(UserModel.email)
+        )
+        result = await self.session.execute(stmt)
+        inserted = set(result.scalars().all())
+        await self.session.commit()
 
-        if user.is_superuser:
-            raise ForbiddenError("Cannot delete another superuser account")
+        # An email repeated within the batch is inserted once; later occurrences are conflicts
+        created = []
+        for email, _ in users:
+            created.append(email.lower() in inserted)
+            inserted.discard(email.lower())
+        return created
 
-        await self.session.delete(user)
+    async def delete_user(self, user_identifier: UUID | str, deleting_user_id: UUID) -> UserModel:
+        # The self-deletion and superuser guards are part of the DELETE itself; why nothing matched
+        # is only looked up when the delete is refused
+        match = _identifier_predicate(user_identifier)
+        result = await self.session.scalars(
+            delete(UserModel)
+            .where(match, UserModel.id != deleting_user_id, UserModel.is_superuser == false())
+            .returning(UserModel)
+        )
+        user = result.one_or_none()
+        if user is None:
+            await self._raise_delete_refused(match, deleting_user_id)
+
+        # Every token ever issued to a deleted user is revoked: none can be newer than now + expiry
+        revoked_before = datetime.now(UTC) + timedelta(minutes=settings.jwt_expire_minutes)
+        await RevokedTokenRepository(self.session).revoke(user.id, revoked_before)
         await self.session.commit()
+        principal_cache.invalidate(user.id)
+        token_revocation_list.add(user.id, revoked_before)
 
         return user
+
+    async def _raise_delete_refused(self, match: ColumnElement[bool], deleting_user_id: UUID) -> NoReturn:
+        result = await self.session.execute(select(UserModel.id, UserModel.is_superuser).where(match))
+        row = result.one_or_none()
+        if row is None:
+            raise NotFoundError("User not found")
+        if row.id == deleting_user_id:
+            raise ForbiddenError("Cannot delete your own account")
+        raise ForbiddenError("Cannot delete another superuser account")
+
+    async def release(self) -> None:
+        # Loaded users stay readable: sessions are created with expire_on_commit=False and close() does not expire
+        await self.session.close()
+
+    async def prime_statements(self) -> None:
+        # Matches nothing; what matters is that asyncpg prepares and caches both statements
+        await self.get_user(uuid.UUID(int=0))
+        await self.get_user_by_email("")
+
+    async def delete_stale_unverified_users(self, created_before: datetime, limit: int) -> int:
+        """
+        Delete up to ``limit`` never-registered users created before ``created_before``, oldest first,
+        in one short transaction. Returns the number of rows deleted.
+        """
+        victims = (
+            select(UserModel.id)
+            .where(
+                # Written as in the partial index predicate so the planner can use that index
+                UserModel.is_verified == false(),
+                UserModel.is_superuser == false(),
+                UserModel.created_at < created_before,
+            )
+            .order_by(UserModel.created_at)
+            .limit(limit)
+        )
+        if self.session.get_bind().dialect.name == "postgresql":
+            # Rows another worker is pruning (or a request is registering) are left for later
+            victims = victims.with_for_update(skip_locked=True)
+
+        result = await self.session.execute(
+            delete(UserModel).where(UserModel.id.in_(victims.scalar_subquery())).returning(UserModel.id)
+        )
+        deleted = list(result.scalars().all())
+        await self.session.commit()
+        for user_id in deleted:
+            principal_cache.invalidate(user_id)
+        return len(deleted)
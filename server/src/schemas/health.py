@@ -1,5 +1,22 @@
+from datetime import datetime
+
 from pydantic import BaseModel
 
 
 class HealthResponse(BaseModel):
     status: str
+
+
+class PoolUsageResponse(BaseModel):
+    size: int
+    checked_out: int
+    overflow: int
+
+
+class ReadinessResponse(BaseModel):
+    status: str
+    database: str
+    checked_at: datetime | None = None
+    age_seconds: float | None = None
+    db_latency_ms: float | None = None
+    pool: PoolUsageResponse | None = None
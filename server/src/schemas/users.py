@@ -12,6 +12,8 @@ def _validate_password_length(v: str) -> str:
 
 
 Password = Annotated[str, AfterValidator(_validate_password_length)]
+# Emails are stored and looked up lowercased, see the ix_users_email_lower index
+Email = Annotated[EmailStr, AfterValidator(str.lower)]
 
 
 class UserResponse(BaseModel):
@@ -24,13 +26,18 @@ class UserResponse(BaseModel):
     created_at: datetime
 
 
+class UserListResponse(BaseModel):
+    items: list[UserResponse]
+    next_cursor: str | None = None
+
+
 class UserRegisterRequest(BaseModel):
-    email: EmailStr
+    email: Email
     password: Password
 
 
 class UserLoginRequest(BaseModel):
-    email: EmailStr
+    email: Email
     password: str
 
 
@@ -41,7 +48,7 @@ class TokenResponse(BaseModel):
 
 
 class CreateUserRequest(BaseModel):
-    email: EmailStr
+    email: Email
     password: Password
 
 
@@ -52,9 +59,23 @@ class CreateUserResponse(BaseModel):
 
 
 class DeleteUserRequest(BaseModel):
-    user_identifier: UUID | EmailStr
+    user_identifier: UUID | Email
 
 
 class DeleteUserResponse(BaseModel):
     success: bool
     message: str
+
+
+class BulkImportRowError(BaseModel):
+    line: int
+    email: str | None = None
+    reason: str
+
+
+class BulkImportResponse(BaseModel):
+    created: int = 0
+    conflicts: int = 0
+    invalid: int = 0
+    errors: list[BulkImportRowError] = []
+    errors_truncated: bool = False
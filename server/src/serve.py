@@ -0,0 +1,62 @@
+"""
+Server entry point: ``python -m src.serve``.
+
+Runs uvicorn with ``server_workers`` processes (0 sizes the pool to the CPUs available to the
+container). With more than one worker, Prometheus metrics are written to a shared
+``PROMETHEUS_MULTIPROC_DIR`` so that ``/metrics`` aggregates every worker. Migrations are not run
+here; ``startup.sh`` runs them once before the server starts.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+import uvicorn
+from src.core.config import settings
+
+
+def available_cpus() -> int:
+    """CPUs this process may use, honouring affinity and a cgroup v2 CPU quota"""
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+    except (OSError, ValueError):
+        return cpus
+    if quota == "max":
+        return cpus
+    return max(1, min(cpus, int(quota) // int(period)))
+
+
+def resolve_workers() -> int:
+    return settings.server_workers if settings.server_workers > 0 else available_cpus()
+
+
+def prepare_multiprocess_dir() -> Path:
+    """Point PROMETHEUS_MULTIPROC_DIR at an empty directory before any worker starts"""
+    configured = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    path = Path(configured) if configured else Path(tempfile.mkdtemp(prefix="prometheus-"))
+    path.mkdir(parents=True, exist_ok=True)
+    # Files left by a previous run would be summed into the new one's metrics
+    for stale in path.glob("*.db"):
+        stale.unlink()
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = str(path)
+    return path
+
+
+def main() -> None:
+    workers = resolve_workers()
+    if workers > 1 and settings.metrics_enabled:
+        prepare_multiprocess_dir()
+    uvicorn.run(
+        "src.main:app",
+        host=settings.server_host,
+        port=settings.server_port,
+        workers=workers,
+        forwarded_allow_ips=settings.forwarded_allow_ips,
+        # Stop accepting, then give open requests this long before the lifespan shutdown runs
+        timeout_graceful_shutdown=int(settings.shutdown_drain_timeout_seconds),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
 #!/bin/bash
 set -e
 
+# Migrations run once per container, before any worker process starts
 echo "Running database migrations..."
 alembic upgrade head
 echo "Migrations completed!"
 echo "Starting server..."
-exec uvicorn src.main:app --host 0.0.0.0 --port 8000
+exec python -m src.serve
@@ -1,5 +1,18 @@
+from collections.abc import AsyncIterator
+from typing import Any
+from uuid import UUID
+
+import pytest
 from httpx import AsyncClient
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from src.core.auth import create_token_for_user, password_needs_rehash
+from src.core.config import settings
+from src.core.database import get_postgres_session
+from src.core.revocation import token_revocation_list
+from src.main import app
 from src.models.postgres.users import UserModel
+from src.repositories.users import UserRepository
 
 
 async def test_login_success(client: AsyncClient, test_user: UserModel) -> None:
@@ -15,11 +28,42 @@ async def test_login_wrong_password(client: AsyncClient, test_user: UserModel) -
     assert response.status_code == 401
 
 
+async def test_login_ignores_email_case(client: AsyncClient, test_user: UserModel) -> None:
+    response = await client.post("/api/users/login", json={"email": "TEST@Example.com", "password": "testpass123"})
+    assert response.status_code == 200
+    assert response.json()["user"]["email"] == "test@example.com"
+
+
 async def test_login_nonexistent_user(client: AsyncClient) -> None:
     response = await client.post("/api/users/login", json={"email": "nobody@example.com", "password": "anything"})
     assert response.status_code == 401
 
 
+@pytest.mark.parametrize("rehash_enabled", [True, False])
+async def test_login_rehashes_stale_password_hash(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    test_user: UserModel,
+    monkeypatch: pytest.MonkeyPatch,
+    rehash_enabled: bool,
+) -> None:
+    # test_user's hash has the default 12 rounds; the configured cost is now different
+    monkeypatch.setattr(settings, "password_bcrypt_rounds", 5)
+    monkeypatch.setattr(settings, "password_rehash_on_login", rehash_enabled)
+    old_hash = test_user.password_hash
+    assert old_hash is not None and password_needs_rehash(old_hash)
+
+    response = await client.post("/api/users/login", json={"email": "test@example.com", "password": "testpass123"})
+    assert response.status_code == 200
+
+    await db_session.refresh(test_user)
+    assert test_user.password_hash is not None
+    assert (test_user.password_hash != old_hash) is rehash_enabled
+    assert password_needs_rehash(test_user.password_hash) is not rehash_enabled
+    response = await client.post("/api/users/login", json={"email": "test@example.com", "password": "testpass123"})
+    assert response.status_code == 200
+
+
 async def test_get_me_authenticated(auth_client: AsyncClient, test_user: UserModel) -> None:
     response = await auth_client.get("/api/users/me")
     assert response.status_code == 200
@@ -60,3 +104,151 @@ async def test_register_user(client: AsyncClient) -> None:
     data = response.json()
     assert data["user"]["email"] == "new@example.com"
     assert data["user"]["is_verified"] is True
+
+
+async def test_register_normalizes_email(client: AsyncClient, test_user: UserModel) -> None:
+    token = (await client.post("/api/users/")).json()["access_token"]
+    client.headers["Authorization"] = f"Bearer {token}"
+
+    response = await client.post("/api/users/register", json={"email": "Test@Example.com", "password": "newpass123"})
+    assert response.status_code == 409
+
+    response = await client.post("/api/users/register", json={"email": "New@Example.com", "password": "newpass123"})
+    assert response.status_code == 200
+    assert response.json()["user"]["email"] == "new@example.com"
+
+
+async def test_get_me_uses_principal_cache(
+    auth_client: AsyncClient, test_user: UserModel, db_session: AsyncSession
+) -> None:
+    assert (await auth_client.get("/api/users/me")).status_code == 200
+
+    # Remove the row behind the repository's back: the cached principal is still served
+    await db_session.execute(delete(UserModel).where(UserModel.id == test_user.id))
+    await db_session.commit()
+    response = await auth_client.get("/api/users/me")
+    assert response.status_code == 200
+    assert response.json()["id"] == str(test_user.id)
+
+
+async def test_deleted_user_evicted_from_principal_cache(
+    client: AsyncClient, test_user: UserModel, superuser: UserModel
+) -> None:
+    user_headers = {"Authorization": f"Bearer {create_token_for_user(test_user)}"}
+    superuser_headers = {"Authorization": f"Bearer {create_token_for_user(superuser)}"}
+    assert (await client.get("/api/users/me", headers=user_headers)).status_code == 200
+
+    response = await client.request(
+        "DELETE", "/api/users/delete-user", json={"user_identifier": str(test_user.id)}, headers=superuser_headers
+    )
+    assert response.status_code == 200
+    assert (await client.get("/api/users/me", headers=user_headers)).status_code == 401
+
+
+async def test_login_rehash_does_not_reuse_the_request_session(
+    client: AsyncClient, db_session: AsyncSession, test_user: UserModel, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "password_bcrypt_rounds", 5)
+    old_hash = test_user.password_hash
+    session_factory = async_sessionmaker(db_session.bind, class_=AsyncSession, expire_on_commit=False)
+    request_sessions: list[AsyncSession] = []
+    rehash_sessions: list[AsyncSession] = []
+
+    async def request_session() -> AsyncIterator[AsyncSession]:
+        async with session_factory() as session:
+            request_sessions.append(session)
+            yield session
+
+    replace_password_hash = UserRepository.replace_password_hash
+
+    async def record_replace(self: UserRepository, *args: Any) -> bool:
+        rehash_sessions.append(self.session)
+        return await replace_password_hash(self, *args)
+
+    monkeypatch.setitem(app.dependency_overrides, get_postgres_session, request_session)
+    monkeypatch.setattr(UserRepository, "replace_password_hash", record_replace)
+    response = await client.post("/api/users/login", json={"email": "test@example.com", "password": "testpass123"})
+    assert response.status_code == 200
+
+    # The background task may run after the request's session has been closed, so it opens its own
+    assert len(rehash_sessions) == 1
+    assert rehash_sessions[0] not in request_sessions
+    await db_session.refresh(test_user)
+    assert test_user.password_hash != old_hash
+
+
+async def test_lazy_anonymous_user_lifecycle(
+    client: AsyncClient, db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "anonymous_users_lazy", True)
+    create_response = await client.post("/api/users/")
+    assert create_response.status_code == 200
+    user_id = create_response.json()["user"]["id"]
+    assert (await db_session.execute(select(func.count()).select_from(UserModel))).scalar_one() == 0
+
+    client.headers["Authorization"] = f"Bearer {create_response.json()['access_token']}"
+    me = await client.get("/api/users/me")
+    assert me.status_code == 200
+    assert me.json()["id"] == user_id
+    assert me.json()["is_verified"] is False
+
+    response = await client.post("/api/users/register", json={"email": "lazy@example.com", "password": "newpass123"})
+    assert response.status_code == 200
+    assert response.json()["user"]["id"] == user_id
+    user = await db_session.get(UserModel, UUID(user_id))
+    assert user is not None
+    assert user.email == "lazy@example.com"
+    assert user.is_verified is True
+
+
+async def test_deleted_lazy_user_stays_deleted(
+    client: AsyncClient, superuser: UserModel, db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "anonymous_users_lazy", True)
+    create_response = await client.post("/api/users/")
+    user_id = create_response.json()["user"]["id"]
+    anonymous_headers = {"Authorization": f"Bearer {create_response.json()['access_token']}"}
+    response = await client.post(
+        "/api/users/register", json={"email": "lazy@example.com", "password": "newpass123"}, headers=anonymous_headers
+    )
+    assert response.status_code == 200
+
+    response = await client.request(
+        "DELETE",
+        "/api/users/delete-user",
+        json={"user_identifier": user_id},
+        headers={"Authorization": f"Bearer {create_token_for_user(superuser)}"},
+    )
+    assert response.status_code == 200
+    # As on a worker that did not handle the delete: only the revoked_tokens row knows about it
+    token_revocation_list.clear()
+
+    assert (await client.get("/api/users/me", headers=anonymous_headers)).status_code == 401
+    response = await client.post(
+        "/api/users/register", json={"email": "again@example.com", "password": "newpass123"}, headers=anonymous_headers
+    )
+    assert response.status_code == 401
+    assert await db_session.get(UserModel, UUID(user_id)) is None
+
+
+async def test_register_creates_rows_only_for_anonymous_tokens(
+    client: AsyncClient, test_user: UserModel, db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Stateless auth accepts the claims of a user whose row was removed without a revocation
+    monkeypatch.setattr(settings, "auth_stateless", True)
+    client.headers["Authorization"] = f"Bearer {create_token_for_user(test_user)}"
+    await db_session.execute(delete(UserModel).where(UserModel.id == test_user.id))
+    await db_session.commit()
+
+    response = await client.post("/api/users/register", json={"email": "new@example.com", "password": "newpass123"})
+    assert response.status_code == 404
+    assert await db_session.get(UserModel, test_user.id) is None
+
+
+async def test_deleted_user_token_is_not_treated_as_anonymous(
+    client: AsyncClient, test_user: UserModel, db_session: AsyncSession
+) -> None:
+    client.headers["Authorization"] = f"Bearer {create_token_for_user(test_user)}"
+    await db_session.execute(delete(UserModel).where(UserModel.id == test_user.id))
+    await db_session.commit()
+    assert (await client.get("/api/users/me")).status_code == 401
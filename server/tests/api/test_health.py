@@ -1,4 +1,12 @@
+from pathlib import Path
+
+import pytest
+import structlog
 from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from src.core.config import settings
+from src.core.health import DatabaseHealthMonitor, create_probe_engine, db_health_monitor
 
 
 async def test_root(client: AsyncClient) -> None:
@@ -11,3 +19,67 @@ async def test_health(client: AsyncClient) -> None:
     response = await client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "healthy"}
+
+
+@pytest.fixture
+def monitor(db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch) -> DatabaseHealthMonitor:
+    monkeypatch.setattr(db_health_monitor, "probe_engine", db_session.bind)
+    monkeypatch.setattr(db_health_monitor, "last", None)
+    return db_health_monitor
+
+
+async def test_ready_before_first_check(client: AsyncClient, monitor: DatabaseHealthMonitor) -> None:
+    response = await client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "not_ready"
+
+
+async def test_ready_from_last_check(client: AsyncClient, monitor: DatabaseHealthMonitor) -> None:
+    await monitor.check()
+    with structlog.testing.capture_logs() as logs:
+        response = await client.get("/ready")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "ready"
+    assert data["database"] == "connected"
+    assert data["db_latency_ms"] >= 0
+    assert data["pool"] == {"size": 20, "checked_out": 0, "overflow": 0}
+    # Answered from memory
+    assert [log["db_queries"] for log in logs if log["event"] == "request"] == [0]
+
+
+async def test_ready_stale_result(
+    client: AsyncClient, monitor: DatabaseHealthMonitor, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    await monitor.check()
+    monkeypatch.setattr(settings, "health_check_max_staleness_seconds", 0)
+    response = await client.get("/ready")
+    assert response.status_code == 503
+
+
+async def test_ready_database_down(
+    client: AsyncClient, monitor: DatabaseHealthMonitor, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    broken = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/missing-dir/db.sqlite")
+    monkeypatch.setattr(monitor, "probe_engine", broken)
+    health = await monitor.check()
+    await broken.dispose()
+    assert not health.healthy
+    assert health.error
+
+    response = await client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["database"] == "disconnected"
+
+
+async def test_probe_reuses_one_connection(tmp_path: Path) -> None:
+    probe_engine = create_probe_engine(f"sqlite+aiosqlite:///{tmp_path}/probe.db", {})
+    connects = []
+    event.listen(probe_engine.sync_engine, "connect", lambda *args: connects.append(args))
+    monitor = DatabaseHealthMonitor(probe_engine, pool_engine=probe_engine)
+    try:
+        for _ in range(3):
+            assert (await monitor.check()).healthy
+        assert len(connects) == 1
+    finally:
+        await probe_engine.dispose()
@@ -0,0 +1,102 @@
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+import structlog
+from httpx import AsyncClient
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from src.core.auth import create_access_token, create_token_for_user
+from src.core.cache import principal_cache
+from src.core.config import settings
+from src.core.revocation import token_revocation_list
+from src.models.postgres.users import UserModel
+from src.repositories.revoked_tokens import RevokedTokenRepository
+
+
+@pytest.fixture(autouse=True)
+def stateless_mode(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "auth_stateless", True)
+
+
+async def test_me_served_from_claims(auth_client: AsyncClient, test_user: UserModel, db_session: AsyncSession) -> None:
+    await db_session.execute(delete(UserModel).where(UserModel.id == test_user.id))
+    await db_session.commit()
+    principal_cache.clear()
+
+    response = await auth_client.get("/api/users/me")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["id"] == str(test_user.id)
+    assert data["email"] == "test@example.com"
+    assert data["is_superuser"] is False
+
+
+async def test_superuser_guard_uses_claims(auth_client: AsyncClient) -> None:
+    response = await auth_client.post(
+        "/api/users/create-user", json={"email": "nope@example.com", "password": "password123"}
+    )
+    assert response.status_code == 403
+
+
+async def test_token_without_claims_falls_back_to_database(client: AsyncClient, test_user: UserModel) -> None:
+    token = create_access_token({"sub": str(test_user.id)})
+    response = await client.get("/api/users/me", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.json()["email"] == "test@example.com"
+
+
+async def test_deleted_user_token_revoked(client: AsyncClient, test_user: UserModel, superuser: UserModel) -> None:
+    user_headers = {"Authorization": f"Bearer {create_token_for_user(test_user)}"}
+    superuser_headers = {"Authorization": f"Bearer {create_token_for_user(superuser)}"}
+
+    response = await client.request(
+        "DELETE", "/api/users/delete-user", json={"user_identifier": str(test_user.id)}, headers=superuser_headers
+    )
+    assert response.status_code == 200
+    assert (await client.get("/api/users/me", headers=user_headers)).status_code == 401
+
+
+async def test_revocation_from_another_process_applies_after_refresh(
+    auth_client: AsyncClient, test_user: UserModel, db_session: AsyncSession
+) -> None:
+    # Cutoffs are whole seconds like iat, so revoke from the next second to cover the current token
+    await RevokedTokenRepository(db_session).revoke(test_user.id, datetime.now(UTC) + timedelta(seconds=1))
+    await db_session.commit()
+    assert (await auth_client.get("/api/users/me")).status_code == 200
+
+    await token_revocation_list.refresh(db_session)
+    assert (await auth_client.get("/api/users/me")).status_code == 401
+
+
+async def test_token_issued_right_after_revocation_is_valid(
+    client: AsyncClient, test_user: UserModel, db_session: AsyncSession
+) -> None:
+    # As make_superuser does: revoke the old tokens, then the user logs in again within the same second
+    await RevokedTokenRepository(db_session).revoke(test_user.id, datetime.now(UTC))
+    await db_session.commit()
+    await token_revocation_list.refresh(db_session)
+
+    token = create_token_for_user(test_user)
+    assert (await client.get("/api/users/me", headers={"Authorization": f"Bearer {token}"})).status_code == 200
+
+
+def test_revocation_cutoff_has_iat_granularity() -> None:
+    user_id = uuid4()
+    token_revocation_list.add(user_id, datetime.fromtimestamp(1_700_000_000.75, UTC))
+    assert token_revocation_list.is_revoked(user_id, 1_699_999_999)
+    assert not token_revocation_list.is_revoked(user_id, 1_700_000_000)
+
+
+async def test_revocation_list_starts_without_database(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    broken = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/missing-dir/db.sqlite")
+    monkeypatch.setattr(token_revocation_list, "_task", None)
+    try:
+        with structlog.testing.capture_logs() as logs:
+            await token_revocation_list.start(async_sessionmaker(broken), interval=60)
+        assert [log["event"] for log in logs] == ["token_revocation_refresh_failed"]
+        assert token_revocation_list.last_refresh is None
+    finally:
+        await token_revocation_list.stop()
+        await broken.dispose()
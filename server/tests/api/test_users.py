@@ -1,5 +1,23 @@
-from httpx import AsyncClient
+import asyncio
+import csv
+import io
+import json
+import threading
+from collections.abc import AsyncIterator, Awaitable, Callable
+from datetime import UTC, datetime, timedelta
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from src.api import users as users_api
+from src.core.auth import create_token_for_user, password_hasher
+from src.core.config import settings
+from src.core.database import get_postgres_session
+from src.main import app
 from src.models.postgres.users import UserModel
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
 
 
 async def test_superuser_create_user(superuser_client: AsyncClient) -> None:
@@ -65,3 +83,225 @@ async def test_register_short_password(client: AsyncClient) -> None:
     client.headers["Authorization"] = f"Bearer {token}"
     response = await client.post("/api/users/register", json={"email": "new@example.com", "password": "short"})
     assert response.status_code == 422
+
+
+async def test_superuser_bulk_import_jsonl(
+    superuser_client: AsyncClient, test_user: UserModel, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "bulk_import_batch_size", 2)
+    body = "\n".join(
+        [
+            '{"email": "bulk1@example.com", "password": "password123"}',
+            '{"email": "test@example.com", "password": "password123"}',
+            "not json",
+            "",
+            '{"email": "bulk2@example.com", "password": "short"}',
+            '{"email": "bulk3@example.com", "password": "password123"}',
+            '{"email": "bulk3@example.com", "password": "password123"}',
+        ]
+    )
+    response = await superuser_client.post("/api/users/bulk-import", content=body)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 2
+    assert data["conflicts"] == 2
+    assert data["invalid"] == 2
+    assert sorted((error["line"], error["email"]) for error in data["errors"]) == [
+        (2, "test@example.com"),
+        (3, None),
+        (5, "bulk2@example.com"),
+        (7, "bulk3@example.com"),
+    ]
+
+    login = await superuser_client.post(
+        "/api/users/login", json={"email": "bulk3@example.com", "password": "password123"}
+    )
+    assert login.status_code == 200
+
+
+async def test_superuser_bulk_import_csv(superuser_client: AsyncClient) -> None:
+    body = "email,password\ncsv1@example.com,password123\ncsv2@example.com,password456\n"
+    response = await superuser_client.post("/api/users/bulk-import?format=csv", content=body)
+    assert response.status_code == 200
+    assert response.json()["created"] == 2
+
+
+async def test_bulk_import_waits_for_a_busy_hashing_pool(superuser_client: AsyncClient) -> None:
+    # Other requests fill every worker and queue slot; the import waits for room rather than failing
+    release = threading.Event()
+    capacity = password_hasher.max_workers + password_hasher.max_queue
+    busy = [asyncio.create_task(password_hasher.run(release.wait)) for _ in range(capacity)]
+    try:
+        await asyncio.sleep(0)
+        body = '{"email": "busy@example.com", "password": "password123"}'
+        response = asyncio.create_task(superuser_client.post("/api/users/bulk-import", content=body))
+        await asyncio.sleep(0.1)
+        assert not response.done()
+
+        release.set()
+        assert (await response).json()["created"] == 1
+    finally:
+        release.set()
+        await asyncio.gather(*busy)
+
+
+async def test_regular_user_cannot_bulk_import(auth_client: AsyncClient) -> None:
+    response = await auth_client.post(
+        "/api/users/bulk-import", content='{"email": "bulk@example.com", "password": "password123"}'
+    )
+    assert response.status_code == 403
+
+
+async def _create_users(db_session: AsyncSession, count: int) -> list[UserModel]:
+    start = datetime(2024, 1, 1, tzinfo=UTC)
+    users = [UserModel(email=f"user{i}@example.com", created_at=start + timedelta(minutes=i)) for i in range(count)]
+    db_session.add_all(users)
+    await db_session.commit()
+    return users
+
+
+async def test_superuser_list_users_keyset_pagination(
+    superuser_client: AsyncClient, superuser: UserModel, db_session: AsyncSession
+) -> None:
+    await _create_users(db_session, 5)
+
+    seen: list[str] = []
+    cursor = None
+    for _ in range(10):
+        params = {"limit": 2} | ({"cursor": cursor} if cursor else {})
+        response = await superuser_client.get("/api/users/", params=params)
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["items"]) <= 2
+        seen.extend(item["email"] for item in data["items"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    # The superuser fixture was created last, so it sorts last
+    assert seen == [f"user{i}@example.com" for i in range(5)] + ["admin@example.com"]
+
+
+async def test_list_users_invalid_cursor(superuser_client: AsyncClient) -> None:
+    response = await superuser_client.get("/api/users/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+async def test_regular_user_cannot_list_users(auth_client: AsyncClient) -> None:
+    response = await auth_client.get("/api/users/")
+    assert response.status_code == 403
+
+
+async def test_superuser_export_users_ndjson(
+    superuser_client: AsyncClient, db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "user_export_batch_size", 2)
+    await _create_users(db_session, 3)
+
+    response = await superuser_client.get("/api/users/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["email"] for row in rows] == [f"user{i}@example.com" for i in range(3)] + ["admin@example.com"]
+    assert set(rows[0]) == {"id", "email", "is_verified", "is_superuser", "created_at"}
+
+
+async def test_superuser_export_users_csv(superuser_client: AsyncClient, db_session: AsyncSession) -> None:
+    await _create_users(db_session, 2)
+
+    response = await superuser_client.get("/api/users/export", params={"format": "csv"})
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["email"] for row in rows] == ["user0@example.com", "user1@example.com", "admin@example.com"]
+    assert rows[-1]["is_superuser"] == "True"
+
+
+async def test_create_user_rate_limited(client: AsyncClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "rate_limit_create_user", "2/hour")
+    for _ in range(2):
+        assert (await client.post("/api/users/")).status_code == 200
+
+    response = await client.post("/api/users/")
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) > 0
+
+
+@pytest.mark.parametrize(
+    ("peer", "forwarded_for"),
+    [
+        # A client connecting directly: its X-Forwarded-For is not trusted at all
+        ("203.0.113.7", "198.51.100.{i}"),
+        # Through the proxy, with spoofed entries ahead of the address the proxy saw
+        ("172.18.0.3", "198.51.100.{i}, 203.0.113.7"),
+    ],
+)
+async def test_spoofed_forwarded_for_is_still_limited(
+    monkeypatch: pytest.MonkeyPatch, peer: str, forwarded_for: str
+) -> None:
+    monkeypatch.setattr(settings, "rate_limit_create_user", "2/hour")
+    # As uvicorn runs the app with FORWARDED_ALLOW_IPS from the .env examples
+    proxied = ProxyHeadersMiddleware(app, trusted_hosts="172.16.0.0/12,192.168.0.0/16")
+    transport = ASGITransport(app=proxied, client=(peer, 50000))
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        statuses = [
+            (await client.post("/api/users/", headers={"X-Forwarded-For": forwarded_for.format(i=i)})).status_code
+            for i in range(3)
+        ]
+    assert statuses == [200, 200, 429]
+
+
+async def test_login_rate_limited_per_email(
+    client: AsyncClient, test_user: UserModel, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "rate_limit_login_email", "1/minute")
+    body = {"email": "Test@example.com", "password": "wrongpass"}
+    assert (await client.post("/api/users/login", json=body)).status_code == 401
+
+    # Rejected before the password is checked, even with the right one
+    body = {"email": "test@example.com", "password": "testpass123"}
+    with patch("src.api.users.averify_password") as verify:
+        response = await client.post("/api/users/login", json=body)
+    assert response.status_code == 429
+    verify.assert_not_called()
+
+
+async def test_auth_flows_hash_without_holding_a_connection(
+    client: AsyncClient, db_session: AsyncSession, superuser: UserModel, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    session_factory = async_sessionmaker(db_session.bind, class_=AsyncSession, expire_on_commit=False)
+    sessions: list[AsyncSession] = []
+    held_while_hashing: list[bool] = []
+
+    async def tracking_session() -> AsyncIterator[AsyncSession]:
+        async with session_factory() as session:
+            sessions.append(session)
+            yield session
+
+    def tracking(hash_fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        async def wrapper(*args: str) -> Any:
+            held_while_hashing.append(any(session.in_transaction() for session in sessions))
+            return await hash_fn(*args)
+
+        return wrapper
+
+    monkeypatch.setitem(app.dependency_overrides, get_postgres_session, tracking_session)
+    monkeypatch.setattr(users_api, "aget_password_hash", tracking(users_api.aget_password_hash))
+    monkeypatch.setattr(users_api, "averify_password", tracking(users_api.averify_password))
+
+    token = (await client.post("/api/users/")).json()["access_token"]
+    response = await client.post(
+        "/api/users/register",
+        json={"email": "pool@example.com", "password": "password123"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 200
+    response = await client.post("/api/users/login", json={"email": "pool@example.com", "password": "password123"})
+    assert response.status_code == 200
+    response = await client.post(
+        "/api/users/create-user",
+        json={"email": "pool2@example.com", "password": "password123"},
+        headers={"Authorization": f"Bearer {create_token_for_user(superuser)}"},
+    )
+    assert response.status_code == 200
+
+    assert held_while_hashing == [False, False, False]
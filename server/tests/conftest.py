@@ -8,11 +8,15 @@ from httpx import ASGITransport, AsyncClient  # noqa: E402
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
 from sqlalchemy.pool import StaticPool  # noqa: E402
 from src.core.auth import create_token_for_user, get_password_hash  # noqa: E402
-from src.core.database import Base, get_postgres_session  # noqa: E402
+from src.core.cache import principal_cache, token_cache  # noqa: E402
+from src.core.database import Base, get_postgres_session, get_session_factory, instrument_engine  # noqa: E402
+from src.core.rate_limit import rate_limit_backend  # noqa: E402
+from src.core.revocation import token_revocation_list  # noqa: E402
 from src.main import app  # noqa: E402
 from src.models.postgres.users import UserModel  # noqa: E402
 
 test_engine = create_async_engine("sqlite+aiosqlite://", echo=False, poolclass=StaticPool)
+instrument_engine(test_engine)
 TestSessionLocal = async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
 
 
@@ -22,6 +26,7 @@ async def override_get_session() -> AsyncIterator[AsyncSession]:
 
 
 app.dependency_overrides[get_postgres_session] = override_get_session
+app.dependency_overrides[get_session_factory] = lambda: TestSessionLocal
 
 
 @pytest.fixture(autouse=True)
@@ -31,6 +36,10 @@ async def setup_db() -> AsyncIterator[None]:
     yield
     async with test_engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
+    principal_cache.clear()
+    token_cache.clear()
+    token_revocation_list.clear()
+    await rate_limit_backend.reset()
 
 
 @pytest.fixture
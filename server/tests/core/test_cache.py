@@ -0,0 +1,97 @@
+import time
+from datetime import timedelta
+from uuid import UUID, uuid4
+
+import pytest
+from src.core import auth
+from src.core.auth import create_access_token, decode_jwt_payload
+from src.core.cache import TTLCache, token_cache
+from src.core.config import settings
+
+
+def test_get_returns_cached_value() -> None:
+    cache: TTLCache[str, int] = TTLCache("test", max_size=2, ttl_seconds=60)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.get("missing") is None
+
+
+def test_least_recently_used_entry_evicted() -> None:
+    cache: TTLCache[str, int] = TTLCache("test", max_size=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+
+def test_expired_entry_not_served(monkeypatch: pytest.MonkeyPatch) -> None:
+    cache: TTLCache[str, int] = TTLCache("test", max_size=2, ttl_seconds=5)
+    cache.set("a", 1)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 10)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_invalidate_and_disabled_cache() -> None:
+    cache: TTLCache[str, int] = TTLCache("test", max_size=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.invalidate("a")
+    assert cache.get("a") is None
+
+    disabled: TTLCache[str, int] = TTLCache("test", max_size=0, ttl_seconds=60)
+    disabled.set("a", 1)
+    assert disabled.get("a") is None
+
+
+def count_verifications(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    calls: list[str] = []
+    verify = auth._verify_jwt
+
+    def counting_verify(token: str) -> tuple[UUID, dict[str, object]] | None:
+        calls.append(token)
+        return verify(token)
+
+    monkeypatch.setattr(auth, "_verify_jwt", counting_verify)
+    return calls
+
+
+def test_token_cache_skips_repeated_verification(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = count_verifications(monkeypatch)
+    user_id = uuid4()
+    token = create_access_token({"sub": str(user_id)})
+
+    first = decode_jwt_payload(token)
+    assert first is not None and first[0] == user_id
+    assert decode_jwt_payload(token) == first
+    assert len(calls) == 1
+
+    assert decode_jwt_payload(token + "x") is None
+    assert decode_jwt_payload(token + "x") is None
+    assert len(calls) == 3
+
+
+def test_token_cache_entry_ends_at_token_expiry(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = count_verifications(monkeypatch)
+    token = create_access_token({"sub": str(uuid4())}, expires_delta=timedelta(seconds=60))
+    assert decode_jwt_payload(token) is not None
+
+    now = time.monotonic()
+    # Within the cache TTL (300 s by default) but past the token's exp
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+    assert len(token_cache) == 1
+    decode_jwt_payload(token)
+    assert len(calls) == 2
+
+
+def test_token_cache_ignores_entries_from_another_signing_key(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = count_verifications(monkeypatch)
+    token = create_access_token({"sub": str(uuid4())})
+    assert decode_jwt_payload(token) is not None
+
+    monkeypatch.setattr(settings, "secret_key", "rotated-secret-key")
+    assert decode_jwt_payload(token) is None
+    assert len(calls) == 2
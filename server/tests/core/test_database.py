@@ -0,0 +1,93 @@
+from pathlib import Path
+
+import pytest
+import structlog
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import QueuePool
+from src.core.config import settings
+from src.core.database import (
+    Base,
+    InstrumentedQueuePool,
+    asyncpg_connect_args,
+    instrument_engine,
+    track_queries,
+    warm_up_pool,
+)
+from src.repositories.users import UserRepository
+
+
+def sample(name: str, pool: str) -> float:
+    return REGISTRY.get_sample_value(name, {"pool": pool}) or 0.0
+
+
+async def test_pool_metrics(tmp_path: Path) -> None:
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path}/pool.db",
+        poolclass=InstrumentedQueuePool,
+        pool_logging_name="test-pool",
+        pool_size=1,
+        max_overflow=1,
+    )
+    waits_before = sample("db_pool_checkout_wait_seconds_count", "test-pool")
+    held_before = sample("db_pool_connection_held_seconds_count", "test-pool")
+    try:
+        async with engine.connect() as first, engine.connect() as second:
+            await first.execute(text("SELECT 1"))
+            await second.execute(text("SELECT 1"))
+            assert sample("db_pool_checked_out", "test-pool") == 2
+            assert sample("db_pool_overflow", "test-pool") == 1
+
+        assert sample("db_pool_checked_out", "test-pool") == 0
+        assert sample("db_pool_idle", "test-pool") == 1
+        assert sample("db_pool_checkout_wait_seconds_count", "test-pool") == waits_before + 2
+        assert sample("db_pool_connection_held_seconds_count", "test-pool") == held_before + 2
+    finally:
+        await engine.dispose()
+
+
+def test_asyncpg_connect_args(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "db_statement_cache_size", 250)
+    assert asyncpg_connect_args() == {"prepared_statement_cache_size": 250}
+
+    monkeypatch.setattr(settings, "db_pgbouncer", True)
+    args = asyncpg_connect_args()
+    assert args["prepared_statement_cache_size"] == 0
+    assert args["statement_cache_size"] == 0
+    names = {args["prepared_statement_name_func"]() for _ in range(3)}
+    assert len(names) == 3
+
+
+async def prime(session: AsyncSession) -> None:
+    await UserRepository(session).prime_statements()
+
+
+async def test_warm_up_pool(tmp_path: Path) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/warm.db", pool_size=3, max_overflow=5)
+    instrument_engine(engine)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        await engine.dispose()
+
+        with track_queries() as queries:
+            opened = await warm_up_pool(async_sessionmaker(engine), 10, prime)
+        # Capped at the pool size, every connection primed with both lookups and left idle in the pool
+        assert opened == 3
+        assert queries.count == 6
+        assert isinstance(engine.pool, QueuePool)
+        assert engine.pool.checkedin() == 3
+        assert engine.pool.checkedout() == 0
+    finally:
+        await engine.dispose()
+
+
+async def test_warm_up_pool_database_down(tmp_path: Path) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/missing-dir/db.sqlite")
+    try:
+        with structlog.testing.capture_logs() as logs:
+            assert await warm_up_pool(async_sessionmaker(engine), 2) == 0
+        assert [log["event"] for log in logs] == ["db_pool_warm_up_failed"]
+    finally:
+        await engine.dispose()
@@ -0,0 +1,97 @@
+import asyncio
+import threading
+
+import pytest
+from src.core.auth import aget_password_hash, averify_password
+from src.core.exceptions import AppError
+from src.core.executor import BoundedExecutor
+
+
+async def test_run_returns_result() -> None:
+    executor = BoundedExecutor("test", max_workers=1, max_queue=0)
+    try:
+        assert await executor.run(sum, [1, 2, 3]) == 6
+        assert executor.in_flight == 0
+    finally:
+        executor.shutdown()
+
+
+async def test_rejects_when_queue_full() -> None:
+    executor = BoundedExecutor("test", max_workers=1, max_queue=1)
+    release = threading.Event()
+    try:
+        running = asyncio.create_task(executor.run(release.wait))
+        waiting = asyncio.create_task(executor.run(release.wait))
+        await asyncio.sleep(0)
+        assert executor.in_flight == 2
+        assert executor.queued == 1
+
+        with pytest.raises(AppError) as exc_info:
+            await executor.run(release.wait)
+        assert exc_info.value.status_code == 503
+
+        release.set()
+        await asyncio.gather(running, waiting)
+        assert executor.in_flight == 0
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+async def test_waits_for_room_when_asked() -> None:
+    executor = BoundedExecutor("test", max_workers=1, max_queue=0)
+    release = threading.Event()
+    try:
+        running = asyncio.create_task(executor.run(release.wait))
+        await asyncio.sleep(0)
+        with pytest.raises(AppError):
+            await executor.run(sum, [1])
+
+        waiting = asyncio.create_task(executor.run(sum, [1, 2], wait=True))
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+
+        release.set()
+        assert await waiting == 3
+        await running
+        assert executor.in_flight == 0
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+async def test_cancelled_waiter_passes_its_slot_on() -> None:
+    executor = BoundedExecutor("test", max_workers=1, max_queue=0)
+    release = threading.Event()
+    try:
+        running = asyncio.create_task(executor.run(release.wait))
+        await asyncio.sleep(0)
+        first = asyncio.create_task(executor.run(sum, [1], wait=True))
+        second = asyncio.create_task(executor.run(sum, [2], wait=True))
+        await asyncio.sleep(0)
+
+        # The first waiter is cancelled (e.g. its client disconnected) right after being woken
+        wake_waiter = executor._wake_waiter
+
+        def wake_then_cancel() -> None:
+            wake_waiter()
+            first.cancel()
+
+        executor._wake_waiter = wake_then_cancel  # type: ignore[method-assign]
+        release.set()
+        await running
+        executor._wake_waiter = wake_waiter  # type: ignore[method-assign]
+
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert await asyncio.wait_for(second, timeout=5) == 2
+        assert executor.in_flight == 0
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+async def test_async_password_helpers() -> None:
+    password_hash = await aget_password_hash("secret123")
+    assert await averify_password("secret123", password_hash)
+    assert not await averify_password("wrong", password_hash)
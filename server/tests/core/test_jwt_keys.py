@@ -0,0 +1,88 @@
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from httpx import AsyncClient
+from jose import jwt
+from src.core.auth import create_access_token, decode_jwt_payload
+from src.core.config import JwtSigningKey, settings
+from src.core.jwt_keys import key_ring
+
+
+def write_key(path: Path) -> Path:
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    path.write_bytes(
+        private_key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        )
+    )
+    return path
+
+
+def use_keys(monkeypatch: pytest.MonkeyPatch, keys: list[JwtSigningKey]) -> None:
+    monkeypatch.setattr(settings, "jwt_algorithm", "ES256")
+    monkeypatch.setattr(settings, "jwt_signing_keys", keys)
+
+
+def test_es256_rotation(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    now = datetime.now(UTC)
+    old = JwtSigningKey(
+        kid="old", private_key_file=write_key(tmp_path / "old.pem"), active_from=now - timedelta(days=1)
+    )
+    use_keys(monkeypatch, [old])
+    old_token = create_access_token({"sub": str(uuid4())})
+    assert jwt.get_unverified_header(old_token)["kid"] == "old"
+
+    # The next key is published before it becomes active, then takes over signing
+    new = JwtSigningKey(
+        kid="new", private_key_file=write_key(tmp_path / "new.pem"), active_from=now + timedelta(hours=1)
+    )
+    use_keys(monkeypatch, [old, new])
+    assert jwt.get_unverified_header(create_access_token({"sub": str(uuid4())}))["kid"] == "old"
+    assert key_ring().signing_key(now + timedelta(hours=2)).kid == "new"
+
+    new = new.model_copy(update={"active_from": now - timedelta(minutes=1)})
+    use_keys(monkeypatch, [old, new])
+    new_token = create_access_token({"sub": str(uuid4())})
+    assert jwt.get_unverified_header(new_token)["kid"] == "new"
+    assert decode_jwt_payload(old_token) is not None
+    assert decode_jwt_payload(new_token) is not None
+
+    # Once the old key is removed, its tokens no longer verify
+    use_keys(monkeypatch, [new])
+    assert decode_jwt_payload(old_token) is None
+    assert decode_jwt_payload(new_token) is not None
+
+
+def test_es256_rejects_unknown_kid_and_hs256_tokens(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    hs256_token = create_access_token({"sub": str(uuid4())})
+    use_keys(monkeypatch, [JwtSigningKey(kid="a", private_key_file=write_key(tmp_path / "a.pem"))])
+    token = create_access_token({"sub": str(uuid4())})
+
+    use_keys(monkeypatch, [JwtSigningKey(kid="b", private_key_file=write_key(tmp_path / "b.pem"))])
+    assert decode_jwt_payload(token) is None
+    assert decode_jwt_payload(hs256_token) is None
+
+
+async def test_jwks_lets_other_services_verify_tokens(
+    client: AsyncClient, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    use_keys(monkeypatch, [JwtSigningKey(kid="a", private_key_file=write_key(tmp_path / "a.pem"))])
+    user_id = str(uuid4())
+    token = create_access_token({"sub": user_id})
+
+    response = await client.get("/.well-known/jwks.json")
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == f"public, max-age={settings.jwks_max_age_seconds}"
+    jwks = response.json()
+    assert [(key["kid"], key["kty"], key["alg"]) for key in jwks["keys"]] == [("a", "EC", "ES256")]
+    assert "d" not in jwks["keys"][0]
+    assert jwt.decode(token, jwks, algorithms=["ES256"])["sub"] == user_id
+
+
+async def test_jwks_empty_for_shared_secret(client: AsyncClient) -> None:
+    response = await client.get("/.well-known/jwks.json")
+    assert response.json() == {"keys": []}
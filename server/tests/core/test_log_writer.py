@@ -0,0 +1,100 @@
+import io
+import threading
+import time
+
+from src.core.log_writer import QueuedLoggerFactory, QueuedLogWriter
+
+
+class BlockingStream(io.StringIO):
+    def __init__(self) -> None:
+        super().__init__()
+        self.release = threading.Event()
+        self.writing = threading.Event()
+
+    def write(self, s: str) -> int:
+        self.writing.set()
+        self.release.wait(5)
+        return super().write(s)
+
+
+def test_lines_flushed_on_close() -> None:
+    stream = io.StringIO()
+    writer = QueuedLogWriter(max_queue_size=100, overflow="drop", stream=stream)
+    writer.start()
+    logger = QueuedLoggerFactory(writer)()
+    for i in range(10):
+        logger.info(f"line {i}")
+    writer.close()
+
+    assert stream.getvalue().splitlines() == [f"line {i}" for i in range(10)]
+    assert not writer.running
+
+
+def test_writes_synchronously_before_start() -> None:
+    stream = io.StringIO()
+    writer = QueuedLogWriter(max_queue_size=1, overflow="drop", stream=stream)
+    writer.write("hello")
+    assert stream.getvalue() == "hello\n"
+
+
+def test_drop_policy_counts_overflow() -> None:
+    stream = BlockingStream()
+    writer = QueuedLogWriter(max_queue_size=2, overflow="drop", stream=stream)
+    writer.start()
+    writer.write("first")
+    assert stream.writing.wait(5)  # the writer thread is now stuck on "first"
+
+    for i in range(5):
+        writer.write(f"queued {i}")
+    assert writer.dropped == 3
+
+    stream.release.set()
+    writer.close()
+    assert stream.getvalue().splitlines() == ["first", "queued 0", "queued 1"]
+
+
+class FailingStream(io.StringIO):
+    def __init__(self, failures: int) -> None:
+        super().__init__()
+        self.failures = failures
+
+    def write(self, s: str) -> int:
+        if self.failures:
+            self.failures -= 1
+            raise BrokenPipeError("stdout is gone")
+        return super().write(s)
+
+
+def test_failed_write_drops_batch_and_keeps_writing() -> None:
+    stream = FailingStream(failures=1)
+    writer = QueuedLogWriter(max_queue_size=1000, overflow="block", stream=stream)
+    writer.start()
+    writer.write("lost")
+    deadline = time.monotonic() + 5
+    while writer.dropped == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert writer.dropped == 1
+
+    # The same thread carries on writing
+    for i in range(300):
+        writer.write(f"line {i}")
+    writer.close()
+    assert stream.getvalue().splitlines() == [f"line {i}" for i in range(300)]
+    assert writer.dropped == 1
+
+
+def test_close_gives_up_when_the_queue_stays_full() -> None:
+    stream = BlockingStream()
+    writer = QueuedLogWriter(max_queue_size=1, overflow="drop", stream=stream)
+    writer.start()
+    writer.write("first")
+    assert stream.writing.wait(5)
+    writer.write("queued")
+
+    try:
+        start = time.monotonic()
+        writer.close(timeout=0.1)
+        assert time.monotonic() - start < 1
+        assert not writer.running
+    finally:
+        stream.release.set()
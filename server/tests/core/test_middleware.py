@@ -1,4 +1,15 @@
-from httpx import AsyncClient
+import asyncio
+
+import pytest
+import structlog
+from httpx import ASGITransport, AsyncClient
+from prometheus_client import REGISTRY
+from src.core.config import settings
+from src.core.middleware import DrainMiddleware, request_drain
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
 
 
 async def test_request_id_generated(client: AsyncClient) -> None:
@@ -11,3 +22,109 @@ async def test_request_id_preserved(client: AsyncClient) -> None:
     custom_id = "test-request-id-123"
     response = await client.get("/health", headers={"x-request-id": custom_id})
     assert response.headers["x-request-id"] == custom_id
+
+
+async def test_access_log_line(client: AsyncClient) -> None:
+    with structlog.testing.capture_logs() as logs:
+        response = await client.get("/health")
+    assert response.status_code == 200
+
+    access_logs = [log for log in logs if log["event"] == "request"]
+    assert len(access_logs) == 1
+    assert access_logs[0]["method"] == "GET"
+    assert access_logs[0]["path"] == "/health"
+    assert access_logs[0]["status"] == 200
+    assert access_logs[0]["duration"] >= 0
+
+
+async def test_access_log_records_error_status(client: AsyncClient) -> None:
+    with structlog.testing.capture_logs() as logs:
+        response = await client.get("/does-not-exist")
+    assert response.status_code == 404
+    assert [log["status"] for log in logs if log["event"] == "request"] == [404]
+
+
+async def test_access_log_counts_queries(auth_client: AsyncClient) -> None:
+    with structlog.testing.capture_logs() as logs:
+        response = await auth_client.get("/api/users/me")
+    assert response.status_code == 200
+
+    (access_log,) = [log for log in logs if log["event"] == "request"]
+    assert access_log["db_queries"] == 1
+    assert access_log["db_time"] >= 0
+    assert access_log["db_slowest"] <= access_log["db_time"]
+
+
+async def test_access_log_without_queries(client: AsyncClient) -> None:
+    with structlog.testing.capture_logs() as logs:
+        await client.get("/health")
+    (access_log,) = [log for log in logs if log["event"] == "request"]
+    assert access_log["db_queries"] == 0
+    assert access_log["db_time"] == 0
+
+
+async def test_db_metrics_labelled_by_route(auth_client: AsyncClient) -> None:
+    before = REGISTRY.get_sample_value("db_queries_per_request_count", {"route": "/api/users/me"}) or 0
+    await auth_client.get("/api/users/me")
+    after = REGISTRY.get_sample_value("db_queries_per_request_count", {"route": "/api/users/me"})
+    assert after == before + 1
+
+
+async def test_slow_query_logged(auth_client: AsyncClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "db_slow_query_threshold_ms", 1e-6)
+    with structlog.testing.capture_logs() as logs:
+        await auth_client.get("/api/users/me")
+    slow = [log for log in logs if log["event"] == "slow_query"]
+    assert len(slow) == 1
+    assert slow[0]["sql"].startswith("SELECT users.id")
+    assert "\n" not in slow[0]["sql"]
+
+
+@pytest.fixture
+def slow_app() -> tuple[Starlette, asyncio.Event]:
+    release = asyncio.Event()
+
+    async def slow(request: Request) -> PlainTextResponse:
+        await release.wait()
+        return PlainTextResponse("done")
+
+    app = Starlette(routes=[Route("/slow", slow)])
+    app.add_middleware(DrainMiddleware)
+    return app, release
+
+
+async def test_drain_waits_for_in_flight_requests(slow_app: tuple[Starlette, asyncio.Event]) -> None:
+    app, release = slow_app
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            in_flight = asyncio.create_task(client.get("/slow"))
+            while request_drain.in_flight == 0:
+                await asyncio.sleep(0)
+            drain = asyncio.create_task(request_drain.drain(timeout=5))
+            await asyncio.sleep(0.1)
+            assert not drain.done()
+
+            # Turned away while draining, without reaching the app
+            rejected = await client.get("/slow")
+            assert rejected.status_code == 503
+            assert rejected.headers["connection"] == "close"
+
+            release.set()
+            assert await drain == 0
+            assert (await in_flight).text == "done"
+    finally:
+        request_drain.reset()
+
+
+async def test_drain_gives_up_after_timeout(slow_app: tuple[Starlette, asyncio.Event]) -> None:
+    app, release = slow_app
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            in_flight = asyncio.create_task(client.get("/slow"))
+            while request_drain.in_flight == 0:
+                await asyncio.sleep(0)
+            assert await request_drain.drain(timeout=0.1) == 1
+            release.set()
+            await in_flight
+    finally:
+        request_drain.reset()
@@ -0,0 +1,34 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from src.core.config import settings
+from src.core.pruning import StaleUserPruner
+from src.models.postgres.users import UserModel
+
+
+async def test_prune_deletes_only_stale_unverified_users(
+    db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "prune_unverified_after_days", 30)
+    monkeypatch.setattr(settings, "prune_batch_size", 2)
+    monkeypatch.setattr(settings, "prune_batch_pause_seconds", 0)
+    old = datetime.now(UTC) - timedelta(days=31)
+    stale = [UserModel(created_at=old) for _ in range(5)]
+    kept = [
+        UserModel(),
+        UserModel(email="registered@example.com", is_verified=True, created_at=old),
+    ]
+    db_session.add_all(stale + kept)
+    await db_session.commit()
+    before = REGISTRY.get_sample_value("users_pruned_total") or 0
+
+    session_factory = async_sessionmaker(db_session.bind, class_=AsyncSession, expire_on_commit=False)
+    assert await StaleUserPruner().prune(session_factory) == 5
+
+    remaining = (await db_session.execute(select(UserModel.id))).scalars().all()
+    assert set(remaining) == {user.id for user in kept}
+    assert REGISTRY.get_sample_value("users_pruned_total") == before + 5
+    assert await StaleUserPruner().prune(session_factory) == 0
@@ -0,0 +1,49 @@
+import pytest
+from src.core.rate_limit import MemoryRateLimitBackend, RateLimit
+
+
+def test_parse() -> None:
+    assert RateLimit.parse("10/minute") == RateLimit(capacity=10, period_seconds=60.0)
+    assert RateLimit.parse(" 3 / hour ") == RateLimit(capacity=3, period_seconds=3600.0)
+    with pytest.raises(ValueError):
+        RateLimit.parse("10 per minute")
+
+
+async def test_bucket_allows_capacity_then_rejects(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = 1000.0
+    monkeypatch.setattr("src.core.rate_limit.time.monotonic", lambda: now)
+    backend = MemoryRateLimitBackend(max_keys=100)
+    limit = RateLimit.parse("2/minute")
+
+    assert await backend.hit("a", limit) == 0
+    assert await backend.hit("a", limit) == 0
+    assert await backend.hit("a", limit) == pytest.approx(30.0)
+    assert await backend.hit("b", limit) == 0
+
+    now += 30
+    assert await backend.hit("a", limit) == 0
+    assert await backend.hit("a", limit) > 0
+
+
+async def test_refilled_buckets_expire(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = 1000.0
+    monkeypatch.setattr("src.core.rate_limit.time.monotonic", lambda: now)
+    backend = MemoryRateLimitBackend(max_keys=100)
+    limit = RateLimit.parse("2/minute")
+
+    await backend.hit("a", limit)
+    await backend.hit("b", limit)
+    now += 31
+    await backend.hit("c", limit)
+    assert len(backend) == 1
+
+
+async def test_max_keys_evicts_oldest() -> None:
+    backend = MemoryRateLimitBackend(max_keys=2)
+    limit = RateLimit.parse("1/hour")
+    for key in ("a", "b", "c"):
+        await backend.hit(key, limit)
+    assert len(backend) == 2
+    # "a" was evicted, so it starts with a full bucket again
+    assert await backend.hit("a", limit) == 0
+    assert await backend.hit("c", limit) > 0
@@ -0,0 +1,96 @@
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+from jose import jwt
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from src.core.config import settings
+from src.core.database import Base, Replica, replica_router
+from src.models.postgres.users import UserModel
+
+
+@pytest.fixture
+async def replica_engine(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> AsyncIterator[AsyncEngine]:
+    """A second SQLite file standing in for a replica of the in-memory test primary"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/replica.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    monkeypatch.setattr(replica_router, "replicas", [Replica(engine)])
+    yield engine
+    await engine.dispose()
+
+
+def token_for(user: UserModel, age: timedelta) -> str:
+    issued_at = datetime.now(UTC) - age
+    claims = {"sub": str(user.id), "iat": issued_at, "exp": issued_at + timedelta(hours=1)}
+    return str(jwt.encode(claims, settings.secret_key, algorithm=settings.jwt_algorithm))
+
+
+async def test_no_replicas_yields_none() -> None:
+    async with replica_router.session() as session:
+        assert session is None
+
+
+async def test_session_uses_replica(replica_engine: AsyncEngine) -> None:
+    async with replica_router.session() as session:
+        assert session is not None
+        assert session.bind is replica_engine
+
+
+async def test_unreachable_replica_is_skipped(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    broken = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/missing-dir/replica.db")
+    replica = Replica(broken)
+    monkeypatch.setattr(replica_router, "replicas", [replica])
+
+    async with replica_router.session() as session:
+        assert session is None
+    assert replica.down_until > 0
+    await broken.dispose()
+
+
+async def test_me_reads_from_replica(
+    client: AsyncClient, db_session: AsyncSession, test_user: UserModel, replica_engine: AsyncEngine
+) -> None:
+    async with AsyncSession(replica_engine) as replica_session:
+        replica_session.add(UserModel(id=test_user.id, email="lagging@example.com", created_at=test_user.created_at))
+        await replica_session.commit()
+
+    response = await client.get(
+        "/api/users/me", headers={"Authorization": f"Bearer {token_for(test_user, timedelta(minutes=5))}"}
+    )
+    assert response.status_code == 200
+    assert response.json()["email"] == "lagging@example.com"
+
+
+async def test_me_falls_back_to_primary_on_replica_miss(
+    client: AsyncClient, test_user: UserModel, replica_engine: AsyncEngine
+) -> None:
+    response = await client.get(
+        "/api/users/me", headers={"Authorization": f"Bearer {token_for(test_user, timedelta(minutes=5))}"}
+    )
+    assert response.status_code == 200
+    assert response.json()["email"] == test_user.email
+
+
+async def test_fresh_token_sticks_to_primary(
+    client: AsyncClient, test_user: UserModel, replica_engine: AsyncEngine
+) -> None:
+    async with AsyncSession(replica_engine) as replica_session:
+        replica_session.add(UserModel(id=test_user.id, email="lagging@example.com", created_at=test_user.created_at))
+        await replica_session.commit()
+
+    response = await client.get(
+        "/api/users/me", headers={"Authorization": f"Bearer {token_for(test_user, timedelta())}"}
+    )
+    assert response.status_code == 200
+    assert response.json()["email"] == test_user.email
+
+
+async def test_list_users_reads_from_replica(
+    superuser_client: AsyncClient, superuser: UserModel, replica_engine: AsyncEngine
+) -> None:
+    response = await superuser_client.get("/api/users/")
+    assert response.status_code == 200
+    assert response.json()["items"] == []
@@ -0,0 +1,23 @@
+import pytest
+from httpx import AsyncClient
+from src.core.responses import ModelResponse
+from src.schemas.users import DeleteUserResponse
+
+
+def test_model_response_renders_json() -> None:
+    model = DeleteUserResponse(success=True, message="ok")
+    response = ModelResponse(model, status_code=201)
+    assert response.body == model.model_dump_json().encode()
+    assert response.status_code == 201
+    assert response.headers["content-type"] == "application/json"
+
+
+def test_model_response_rejects_plain_data() -> None:
+    with pytest.raises(TypeError):
+        ModelResponse({"success": True})
+
+
+async def test_openapi_keeps_response_models(client: AsyncClient) -> None:
+    schema = (await client.get("/openapi.json")).json()
+    me = schema["paths"]["/api/users/me"]["get"]["responses"]["200"]
+    assert me["content"]["application/json"]["schema"] == {"$ref": "#/components/schemas/UserResponse"}
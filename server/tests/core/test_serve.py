@@ -0,0 +1,25 @@
+import os
+from pathlib import Path
+
+import pytest
+from src.core.config import settings
+from src.serve import available_cpus, prepare_multiprocess_dir, resolve_workers
+
+
+def test_resolve_workers_from_settings(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "server_workers", 3)
+    assert resolve_workers() == 3
+
+
+def test_resolve_workers_auto(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "server_workers", 0)
+    assert resolve_workers() == available_cpus() >= 1
+
+
+def test_prepare_multiprocess_dir_clears_stale_files(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    (tmp_path / "counter_123.db").write_bytes(b"stale")
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+
+    assert prepare_multiprocess_dir() == tmp_path
+    assert list(tmp_path.iterdir()) == []
+    assert os.environ["PROMETHEUS_MULTIPROC_DIR"] == str(tmp_path)
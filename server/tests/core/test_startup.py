@@ -0,0 +1,32 @@
+import os
+from pathlib import Path
+
+import pytest
+from benchmarks.startup import measure_phases
+from httpx import ASGITransport, AsyncClient
+from src.core.config import settings
+from src.main import create_app
+
+# Seconds from process start to the first response; override for slow CI machines
+STARTUP_BUDGET_SECONDS = float(os.environ.get("STARTUP_BUDGET_SECONDS", "5.0"))
+
+
+def test_time_to_first_request_within_budget() -> None:
+    phases = measure_phases()
+    assert phases["first_request"] < STARTUP_BUDGET_SECONDS, phases
+
+
+async def test_docs_disabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "docs_enabled", False)
+    async with AsyncClient(transport=ASGITransport(app=create_app()), base_url="http://test") as client:
+        assert (await client.get("/openapi.json")).status_code == 404
+        assert (await client.get("/docs")).status_code == 404
+
+
+async def test_pre_generated_openapi(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    schema_path = tmp_path / "openapi.json"
+    schema_path.write_text('{"openapi": "3.1.0", "info": {"title": "artifact", "version": "1"}, "paths": {}}')
+    monkeypatch.setattr(settings, "openapi_schema_path", str(schema_path))
+    async with AsyncClient(transport=ASGITransport(app=create_app()), base_url="http://test") as client:
+        response = await client.get("/openapi.json")
+    assert response.json()["info"]["title"] == "artifact"
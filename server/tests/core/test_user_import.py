@@ -0,0 +1,15 @@
+from collections.abc import AsyncIterator
+
+from src.core.user_import import iter_lines
+
+
+async def _chunks(*chunks: bytes) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+
+
+async def test_iter_lines_across_chunk_boundaries() -> None:
+    data = "first\nsecönd\nthird".encode()
+    split = data.index("ö".encode()) + 1  # split inside the multi-byte character
+    lines = [line async for line in iter_lines(_chunks(data[:3], data[3:split], data[split:]))]
+    assert lines == ["first", "secönd", "third"]
@@ -0,0 +1,105 @@
+import uuid
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.core.database import track_queries
+from src.core.exceptions import ConflictError, ForbiddenError, NotFoundError
+from src.models.postgres.revoked_tokens import RevokedTokenModel
+from src.models.postgres.users import UserModel
+from src.repositories.users import UserRepository
+
+
+async def test_writes_take_one_statement(db_session: AsyncSession) -> None:
+    repository = UserRepository(db_session)
+
+    with track_queries() as stats:
+        anonymous = await repository.create_user()
+    assert stats.count == 1
+    assert anonymous.email is None and not anonymous.is_verified
+
+    with track_queries() as stats:
+        registered = await repository.register_user(anonymous.id, "anon@example.com", "hash")
+    assert stats.count == 1
+    assert registered.id == anonymous.id and registered.is_verified
+
+    with track_queries() as stats:
+        created = await repository.create_registered_user("new@example.com", "hash")
+    assert stats.count == 1
+    assert created.email == "new@example.com" and created.created_at is not None
+
+
+async def test_register_user_without_row_inserts_it(db_session: AsyncSession) -> None:
+    user_id = uuid.uuid4()
+
+    user = await UserRepository(db_session).register_user(user_id, "lazy@example.com", "hash", create_missing=True)
+
+    assert user.id == user_id and user.is_verified
+    assert await db_session.get(UserModel, user_id) is not None
+
+
+async def test_conflicting_writes_raise(db_session: AsyncSession, test_user: UserModel) -> None:
+    repository = UserRepository(db_session)
+    email = str(test_user.email)
+
+    with track_queries() as stats, pytest.raises(ConflictError):
+        await repository.create_registered_user(email, "hash")
+    assert stats.count == 1
+
+    anonymous = await repository.create_user()
+    with pytest.raises(ConflictError):
+        await repository.register_user(anonymous.id, email, "hash")
+    with pytest.raises(ConflictError):
+        await repository.register_user(uuid.uuid4(), email, "hash", create_missing=True)
+
+
+async def test_delete_user_deletes_and_revokes(
+    db_session: AsyncSession, test_user: UserModel, superuser: UserModel
+) -> None:
+    with track_queries() as stats:
+        deleted = await UserRepository(db_session).delete_user(str(test_user.email), superuser.id)
+
+    # The DELETE and the revocation upsert
+    assert stats.count == 2
+    assert deleted.id == test_user.id
+    assert (await db_session.execute(select(UserModel).where(UserModel.id == test_user.id))).first() is None
+    assert await db_session.get(RevokedTokenModel, test_user.id) is not None
+
+
+async def test_delete_user_refusals(db_session: AsyncSession, test_user: UserModel, superuser: UserModel) -> None:
+    repository = UserRepository(db_session)
+    other_superuser = UserModel(email="other-admin@example.com", is_verified=True, is_superuser=True)
+    db_session.add(other_superuser)
+    await db_session.commit()
+
+    with pytest.raises(NotFoundError):
+        await repository.delete_user(uuid.uuid4(), superuser.id)
+    with pytest.raises(ForbiddenError, match="your own account"):
+        await repository.delete_user(superuser.id, superuser.id)
+    with pytest.raises(ForbiddenError, match="another superuser"):
+        await repository.delete_user(other_superuser.id, superuser.id)
+    assert await db_session.get(UserModel, test_user.id) is not None
+
+
+async def test_email_lookup_is_case_insensitive_and_indexed(db_session: AsyncSession, test_user: UserModel) -> None:
+    repository = UserRepository(db_session)
+
+    user = await repository.get_user_by_email("Test@EXAMPLE.com")
+    assert user is not None and user.id == test_user.id
+    assert await repository.find_existing_emails(["TEST@example.com", "other@example.com"]) == {"test@example.com"}
+
+    plan = await db_session.execute(
+        text("EXPLAIN QUERY PLAN SELECT id FROM users WHERE lower(users.email) = :email"),
+        {"email": "test@example.com"},
+    )
+    assert any("ix_users_email_lower" in row[-1] for row in plan)
+
+
+async def test_replace_password_hash_only_replaces_expected_hash(db_session: AsyncSession) -> None:
+    repository = UserRepository(db_session)
+    user = await repository.create_registered_user("rehash@example.com", "old-hash")
+
+    assert await repository.replace_password_hash(user.id, "other-hash", "new-hash") is False
+    assert await repository.replace_password_hash(user.id, "old-hash", "new-hash") is True
+    await db_session.refresh(user)
+    assert user.password_hash == "new-hash"